@@ -7,6 +7,9 @@ from PyQt6.QtCore import QObject, pyqtSignal
 # Set High DPI scaling environment variable *before* importing PyQt
 os.environ["QT_ENABLE_HIGHDPI_SCALING"] = "1"
 
+# Decide library thread counts *before* numba is imported
+from pipeline import threads
+
 # Import necessary classes
 from login import LoginWindow
 from sign_up import SignUpWindow
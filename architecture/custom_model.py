@@ -1,3 +1,4 @@
+import numpy as np
 import tensorflow as tf
 from tensorflow.keras.utils import register_keras_serializable
 
@@ -17,32 +18,41 @@ class PositionalEncoding(tf.keras.layers.Layer):
                 trainable=True,
             )
 
+        # The table depends only on max_steps and d_model, so it is built once
+        # and sliced to the sequence length in call()
+        position = np.arange(max_steps, dtype=np.float32)[:, np.newaxis]
+        div_term = np.arange(d_model, dtype=np.float32)[np.newaxis, :]
+        pos_encoding = self.get_angles(position, div_term)
+        pos_encoding = np.concatenate(
+            [np.sin(pos_encoding[:, 0::2]), np.cos(pos_encoding[:, 1::2])], axis=-1
+        )
+        self.pos_encoding = tf.constant(pos_encoding[np.newaxis], dtype=tf.float32)
+
     def get_angles(self, pos, i):
-        angle_rates = 1 / tf.pow(
-            10000.0, (2 * (i // 2)) / tf.cast(self.d_model, tf.float32)
+        angle_rates = 1 / np.power(
+            np.float32(10000.0), (2 * (i // 2)) / np.float32(self.d_model)
         )
         return pos * angle_rates
 
     def call(self, inputs):
-        batch_size, seq_len, _ = (
-            tf.shape(inputs)[0],
-            tf.shape(inputs)[1],
-            tf.shape(inputs)[2],
-        )
-        position = tf.range(seq_len, dtype=tf.float32)[:, tf.newaxis]
-        div_term = tf.range(self.d_model, dtype=tf.float32)[tf.newaxis, :]
-
-        pos_encoding = self.get_angles(position, div_term)
-        pos_encoding = tf.concat(
-            [tf.sin(pos_encoding[:, 0::2]), tf.cos(pos_encoding[:, 1::2])], axis=-1
-        )
-        pos_encoding = tf.expand_dims(pos_encoding, 0)
-
-        output = inputs + tf.cast(pos_encoding, dtype=tf.float32)
+        # Use the static length when known so the slice folds to a constant
+        seq_len = inputs.shape[1] or tf.shape(inputs)[1]
+        output = inputs + self.pos_encoding[:, :seq_len, :]
         if self.use_learned_bias:
             output += self.bias  # soft global tuning
         return output
 
+    def get_config(self):
+        config = super().get_config()
+        config.update(
+            {
+                "max_steps": self.max_steps,
+                "d_model": self.d_model,
+                "use_learned_bias": self.use_learned_bias,
+            }
+        )
+        return config
+
 
 def error_focused_loss(error_weight=10.0, gamma=2.0):
     def loss(y_true, y_pred):
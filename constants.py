@@ -48,7 +48,12 @@ LSTM2_IMAGE_PATH = "imgs/lstm2-image.png"
 BLAZEPOSE_IMAGE_PATH = "imgs/blazepose.png"
 ATTENTION_MECHANISM_IMAGE_PATH = "imgs/attention-mechanism.png"
 
-# Exercise video paths
-TORSO_PREVIEW_VID = "videos/torso-preview.mp4"
-FLANK_PREVIEW_VID = "videos/flank-preview.mp4"
-HIDING_FACE_PREVIEW_VID = "videos/hiding-preview.mp4"
+# Exercise names, encodings, thresholds, videos and images are in exercises.json
+
+# Camera capture settings
+CAMERA_INDEX = 0
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FOURCC = "MJPG"  # "MJPG" or "YUYV"
+CAMERA_BUFFER_SIZE = 1  # Frames held by the driver; 1 keeps capture latency low
+CAMERA_FPS = 30
@@ -18,6 +18,7 @@ import cv2
 import constants
 import font_utils
 import os
+from pipeline.exercises import REGISTRY
 
 class ExercisesWindow(QMainWindow):
     home_button_clicked = pyqtSignal()
@@ -37,14 +38,15 @@ class ExercisesWindow(QMainWindow):
         self.main_view = QWidget()
         self.init_main_view()
         
-        self.torso_view = self.create_exercise_detail_view("Torso Rotation", constants.TORSO_PREVIEW_VID)
-        self.flank_view = self.create_exercise_detail_view("Flank Stretch", constants.FLANK_PREVIEW_VID)
-        self.hiding_view = self.create_exercise_detail_view("Hiding Face", constants.HIDING_FACE_PREVIEW_VID)
+        # One detail view per exercise in the registry
+        self.detail_views = {
+            name: self.create_exercise_detail_view(name, REGISTRY[name]["preview_video"])
+            for name in REGISTRY.names
+        }
         
         self.stacked_widget.addWidget(self.main_view)
-        self.stacked_widget.addWidget(self.torso_view)
-        self.stacked_widget.addWidget(self.flank_view)
-        self.stacked_widget.addWidget(self.hiding_view)
+        for detail_view in self.detail_views.values():
+            self.stacked_widget.addWidget(detail_view)
         
         self.setCentralWidget(self.stacked_widget)
         
@@ -143,22 +145,11 @@ class ExercisesWindow(QMainWindow):
         exercise_layout.setSpacing(0)  
         exercise_layout.setContentsMargins(0, 0, 0, 0)
         
-        torso_img_path = os.path.join(self.script_dir, "imgs", "torso-rotation-ex.png")
-        flank_img_path = os.path.join(self.script_dir, "imgs", "flank-stretch-ex.png")
-        hiding_img_path = os.path.join(self.script_dir, "imgs", "hiding-face-ex.png")
-        
-        torso_container, torso_img = self.create_clickable_image("Torso Rotation", torso_img_path)
-        flank_container, flank_img = self.create_clickable_image("Flank Stretch", flank_img_path)
-        hiding_container, hiding_img = self.create_clickable_image("Hiding Face", hiding_img_path)
-        
-        # Connect image clicks to show detail views
-        torso_img.mousePressEvent = lambda event: self.stacked_widget.setCurrentWidget(self.torso_view)
-        flank_img.mousePressEvent = lambda event: self.stacked_widget.setCurrentWidget(self.flank_view)
-        hiding_img.mousePressEvent = lambda event: self.stacked_widget.setCurrentWidget(self.hiding_view)
-        
-        exercise_layout.addWidget(torso_container, 1)  
-        exercise_layout.addWidget(flank_container, 1)  
-        exercise_layout.addWidget(hiding_container, 1)  
+        for name in REGISTRY.names:
+            container, img = self.create_clickable_image(name, REGISTRY.path(REGISTRY[name]["image"]))
+            # Connect image clicks to show detail views
+            img.mousePressEvent = lambda event, name=name: self.stacked_widget.setCurrentWidget(self.detail_views[name])
+            exercise_layout.addWidget(container, 1)
         
         scroll_content_layout_main.addLayout(exercise_layout)
         
@@ -398,60 +389,7 @@ class ExercisesWindow(QMainWindow):
 
         # Instructions text based on exercise type
         instruction_text = QLabel()
-        if exercise_name == "Torso Rotation":
-            instruction_text.setText(
-                "  <b>Target Areas:</b> Spine, core, and obliques<br>"
-                "  <b>Purpose:</b> Improves spinal mobility, flexibility, and reduces pain.<br><br>"
-                "  <b>Instructions:</b><br><br>"
-                "  <b>1. Starting Position:</b><br>"
-                "     • Sit upright on a chair with your feet flat on the floor, shoulder-width apart.<br>"
-                "     • Keep your back straight and shoulders relaxed.<br><br>"
-                "  <b>2. Execution:</b><br>"
-                "     • Slowly rotate your upper body to the right while keeping your hips and lower body stable.<br>"
-                "     • Hold the end position briefly (2–3 seconds), feeling a gentle stretch along your side and spine.<br>"
-                "     • Return to the center with control.<br>"
-                "     • Repeat the same movement to the left.<br><br>"
-                "  <b>3. Tips:</b><br>"
-                "     • Do not allow your knees or hips to twist.<br>"
-                "     • Avoid jerky or rapid movements; keep it slow and fluid."
-            )
-        elif exercise_name == "Flank Stretch":
-            instruction_text.setText(
-                "  <b>Target Areas:</b> Side torso, obliques, and lower back<br>"
-                "  <b>Purpose:</b> Enhances flexibility and relieves tension in the lower back.<br><br>"
-                "  <b>Instructions:</b><br><br>"
-                "  <b>1. Starting Position:</b><br>"
-                "     • Sit upright on a stable chair.<br>"
-                "     • Keep your back straight and feet flat on the floor.<br><br>"
-                "  <b>2. Execution:</b><br>"
-                "     • Lift your right arm straight overhead, keeping your arm close to your ear.<br>"
-                "     • Inhale deeply, and as you exhale, slowly bend your torso to the left—away from the lifted arm.<br>"
-                "     • Feel the stretch along your right side.<br>"
-                "     • Hold for 5–10 seconds, breathing steadily.<br>"
-                "     • Return to the center and switch sides.<br><br>"
-                "  <b>3. Tips:</b><br>"
-                "     • Avoid leaning forward or twisting.<br>"
-                "     • Do not over extend.<br>"
-                "     • Keep your arm extended and your neck relaxed."
-            )
-        else:  # Hiding Face
-            instruction_text.setText(
-                "  <b>Target Areas:</b> Shoulders, upper back, neck, and core<br>"
-                "  <b>Purpose:</b> Promotes upper body mobility, core engagement, and spinal stability.<br><br>"
-                "  <b>Instructions:</b><br><br>"
-                "  <b>1. Starting Position:</b><br>"
-                "     • Sit or stand upright with your feet shoulder-width apart.<br>"
-                "     • Raise both arms to shoulder height with elbows bent at 90 degrees in front of your face, as if \"hiding your face\" behind your forearms.<br>"
-                "     • Your forearms should point straight up (like the letter \"L\").<br><br>"
-                "  <b>2. Execution:</b><br>"
-                "     • Slowly rotate both elbows outwards away from each other (like a goalpost).<br>"
-                "     • Engage your core and upper back muscles during the movement.<br>"
-                "     • Pause briefly, then return to the starting position with control.<br><br>"
-                "  <b>3. Tips:</b><br>"
-                "     • Keep your shoulders level and avoid shrugging.<br>"
-                "     • Maintain a straight spine and stable hips.<br>"
-                "     • Avoid jerky arm movements—smooth control is key."
-            )
+        instruction_text.setText(REGISTRY.instructions(exercise_name))
         
         instruction_text.setFont(font_utils.get_font(size=14))
         instruction_text.setWordWrap(True)
@@ -0,0 +1,110 @@
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+from pipeline.inference import InferenceEngine
+
+
+class MicroBatcher:
+    """
+    Merges classifier requests from many threads into batched invokes.
+
+    submit() queues a (T, features) window and returns a Future. A single
+    worker thread owns the engine: it takes the first queued window, keeps
+    collecting for up to max_delay_ms or until max_batch windows are queued,
+    then runs them in one invoke and resolves every Future with its row of
+    probabilities. max_delay_ms=0 merges only what is already queued.
+    """
+
+    def __init__(self, model_path, max_batch=16, max_delay_ms=2.0, **engine_settings):
+        self.engine = InferenceEngine(model_path, batch_size=max_batch, **engine_settings)
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.window_shape = tuple(int(size) for size in self.engine.input_shape[1:])
+        self._batch = np.zeros(self.engine.input_shape, dtype=np.float32)
+        self._queue = queue.Queue()
+        self._thread = None
+
+        self.batch_sizes = Counter()
+        self.invoke_seconds = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, window):
+        """Queues one window; the Future resolves to its probabilities, shape (joints,)"""
+        window = np.asarray(window, dtype=np.float32)
+        if window.shape != self.window_shape:
+            raise ValueError(f"Expected a window of shape {self.window_shape}, got {window.shape}")
+        future = Future()
+        self._queue.put((window, future))
+        return future
+
+    def predict(self, window, timeout=None):
+        return self.submit(window).result(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            deadline = time.perf_counter() + self.max_delay
+            stopping = False
+            while len(pending) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                pending.append(item)
+            self._invoke(pending)
+            if stopping:
+                return
+
+    def _invoke(self, pending):
+        # Requests whose caller gave up and cancelled are not run
+        pending = [(window, future) for window, future in pending if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+        start = time.perf_counter()
+        try:
+            for row, (window, _) in enumerate(pending):
+                self._batch[row] = window
+            self.engine.write_batch(self._batch)
+            # Copied, so the output buffer is free for the next invoke
+            probabilities = np.array(self.engine.invoke()[:len(pending)])
+        except Exception as e:
+            # Fail this batch only; the worker must survive to serve the next one
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.invoke_seconds += time.perf_counter() - start
+        self.batch_sizes[len(pending)] += 1
+        for (_, future), row in zip(pending, probabilities):
+            future.set_result(row)
+
+    def stats(self):
+        """Request and invoke counts, mean batch size and mean invoke time in milliseconds"""
+        batches = sum(self.batch_sizes.values())
+        requests = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "ms_per_invoke": 1000.0 * self.invoke_seconds / batches if batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+
+import cv2
+from PyQt6.QtCore import QThread, QMutex, QWaitCondition
+
+
+class CameraGrabber(QThread):
+    """
+    Grabs frames from a camera on a dedicated thread and keeps only the newest one.
+
+    The camera is drained continuously so its internal buffer never holds stale
+    frames. Every grabbed frame is decoded and replaces the one in the slot, so
+    read() always returns the most recent frame and its own grab time; a frame
+    the consumer was too slow to take is dropped, not delivered late.
+    """
+
+    def __init__(self, camera_index=0, width=640, height=480, fourcc="MJPG", buffer_size=1, fps=30):
+        super().__init__()
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self.fps = fps
+
+        self.capture = None
+        self.running = False
+
+        # Latest frame slot, protected by mutex
+        self.mutex = QMutex()
+        self.frame_ready = QWaitCondition()
+        self._frame = None
+        self._frame_id = 0
+        self._capture_time = 0.0
+        self._consumed = True
+
+        # Capture-to-process latency, in seconds
+        self.latencies = deque(maxlen=30)
+
+    def open(self):
+        """Open the camera and apply the capture settings. Returns True on success."""
+        self.capture = cv2.VideoCapture(self.camera_index)
+        if not self.capture.isOpened():
+            return False
+        if self.fourcc:
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.width and self.height:
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            self.capture.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size:
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        print(
+            f"Camera {self.camera_index} opened at "
+            f"{int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+            f"{int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+            f"@ {self.capture.get(cv2.CAP_PROP_FPS):.0f} fps"
+        )
+        return True
+
+    def run(self):
+        if self.capture is None and not self.open():
+            print(f"Error: Could not open camera {self.camera_index}")
+            return
+        self.running = True
+
+        while self.running:
+            if not self.capture.grab():
+                print("Error: Failed to capture frame.")
+                time.sleep(0.5)
+                # Try reopening
+                self.capture.release()
+                if not self.open():
+                    print(f"Error: Could not reopen camera {self.camera_index}.")
+                    break
+                continue
+            capture_time = time.perf_counter()
+
+            # Decoded even if the previous frame was not read yet, so it is replaced by this newer one
+            ret, frame = self.capture.retrieve()
+            if not ret:
+                continue
+
+            self.mutex.lock()
+            self._frame = frame
+            self._frame_id += 1
+            self._capture_time = capture_time
+            self._consumed = False
+            self.frame_ready.wakeAll()
+            self.mutex.unlock()
+
+        self.running = False
+        # Wake any waiting consumer so it can notice the grabber stopped
+        self.mutex.lock()
+        self.frame_ready.wakeAll()
+        self.mutex.unlock()
+
+        if self.capture is not None and self.capture.isOpened():
+            self.capture.release()
+        self.capture = None
+
+    def read(self, timeout_ms=1000):
+        """
+        Returns (frame, capture_time) for the newest frame not yet read, waiting up
+        to timeout_ms for one to arrive. Returns (None, None) if no frame arrived.
+        """
+        self.mutex.lock()
+        try:
+            if self._consumed and self.isRunning():
+                self.frame_ready.wait(self.mutex, timeout_ms)
+            if self._consumed:
+                return None, None
+            self._consumed = True
+            return self._frame, self._capture_time
+        finally:
+            self.mutex.unlock()
+
+    def record_latency(self, capture_time):
+        """Record the time from grab() to the end of processing for a frame, in seconds"""
+        latency = time.perf_counter() - capture_time
+        self.latencies.append(latency)
+        return latency
+
+    def average_latency_ms(self):
+        """Average capture-to-process latency over the last frames, in milliseconds"""
+        if not self.latencies:
+            return 0.0
+        return 1000.0 * sum(self.latencies) / len(self.latencies)
+
+    def stop(self):
+        """Stop grabbing and release the camera"""
+        self.running = False
+        self.wait()
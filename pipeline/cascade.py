@@ -0,0 +1,92 @@
+import os
+import time
+
+import numpy as np
+
+
+def summary_features(windows, encoding_size=3):
+    """
+    Cheap per-window features for the stage-1 model, shape (N, features):
+    the exercise one-hot, then per keypoint coordinate its range over the
+    window and its mean absolute frame-to-frame velocity.
+    windows: (N, T, encoding + keypoints) or a single (T, encoding + keypoints) window
+    """
+    windows = np.asarray(windows, dtype=np.float32)
+    if windows.ndim == 2:
+        windows = windows[np.newaxis]
+    keypoints = windows[:, :, encoding_size:]
+    value_range = keypoints.max(axis=1) - keypoints.min(axis=1)
+    velocity = np.abs(np.diff(keypoints, axis=1)).mean(axis=1)
+    return np.concatenate([windows[:, 0, :encoding_size], value_range, velocity], axis=1)
+
+
+def cascade_path(model_path):
+    """The stage-1 model is fitted for, and stored next to, one classifier"""
+    return os.path.splitext(model_path)[0] + ".cascade.npz"
+
+
+class CorrectnessCascade:
+    """
+    Stage 1 of a two-stage classifier: a logistic regression over
+    summary_features() that predicts whether the full model would call the
+    window "Correct". Windows it is confident about skip the full model;
+    everything else is passed on.
+
+    Fitted offline by utils/fit_cascade.py. Counts hits and times both stages so
+    the savings can be reported.
+    """
+
+    def __init__(self, weights, bias, mean, std, threshold):
+        self.weights = weights
+        self.bias = float(bias)
+        self.mean = mean
+        self.std = std
+        self.threshold = float(threshold)
+        self.hits = 0
+        self.passed = 0
+        self.stage1_seconds = 0.0
+        self.stage2_seconds = 0.0
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], data["mean"], data["std"], data["threshold"])
+
+    def save(self, path, **metadata):
+        np.savez(path, weights=self.weights, bias=self.bias, mean=self.mean, std=self.std,
+                 threshold=self.threshold, **metadata)
+
+    def probability_correct(self, windows):
+        """Stage-1 probability that each window is "Correct", shape (N,)"""
+        features = (summary_features(windows) - self.mean) / self.std
+        return 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+
+    def is_confidently_correct(self, window):
+        """True if the window can be called "Correct" without running the full model"""
+        start = time.perf_counter()
+        confident = bool(self.probability_correct(window)[0] >= self.threshold)
+        self.stage1_seconds += time.perf_counter() - start
+        if confident:
+            self.hits += 1
+        else:
+            self.passed += 1
+        return confident
+
+    def record_model_time(self, seconds):
+        """Time the full model took on a window stage 1 passed on"""
+        self.stage2_seconds += seconds
+
+    def stats(self):
+        """Hit rate and the estimated invoke time saved, in milliseconds"""
+        total = self.hits + self.passed
+        stage2_ms = 1000.0 * self.stage2_seconds / self.passed if self.passed else 0.0
+        stage1_ms = 1000.0 * self.stage1_seconds / total if total else 0.0
+        return {
+            "windows": total,
+            "hits": self.hits,
+            "hit_rate": self.hits / total if total else 0.0,
+            "stage1_ms": stage1_ms,
+            "stage2_ms": stage2_ms,
+            # Model time the hits would have cost, minus what stage 1 cost on every window
+            "saved_ms": self.hits * stage2_ms - total * stage1_ms,
+        }
@@ -0,0 +1,100 @@
+import os
+import json
+
+import numpy as np
+
+
+def load_dataset(path):
+    """
+    Loads a labeled window dataset from an .npz with "windows" (N, T, 21) and
+    "labels" (N, joints). The exercise of each window is read from its
+    one-hot encoding in the first 3 features.
+    """
+    with np.load(path) as data:
+        windows = data["windows"].astype(np.float32)
+        labels = data["labels"].astype(bool)
+    return windows, labels, exercise_indices(windows)
+
+
+def exercise_indices(windows):
+    return windows[:, 0, :3].argmax(axis=1)
+
+
+def batched_predict(predict, windows, batch_size=1024):
+    """Runs predict over the windows in batches and concatenates the probabilities"""
+    return np.concatenate([predict(windows[i:i + batch_size]) for i in range(0, len(windows), batch_size)])
+
+
+def confusion_counts(probabilities, labels, exercise_index, threshold_matrix):
+    """
+    True/false positive and negative counts per exercise and joint, each (E, joints).
+    Every window is thresholded with its own exercise's row of threshold_matrix.
+    """
+    predicted = probabilities > threshold_matrix[exercise_index]
+    labels = labels.astype(bool)
+    # One-hot exercise membership turns the per-exercise sums into one matmul
+    membership = np.eye(len(threshold_matrix), dtype=np.int64)[exercise_index].T
+    tp = membership @ (predicted & labels)
+    fp = membership @ (predicted & ~labels)
+    fn = membership @ (~predicted & labels)
+    tn = membership @ (~predicted & ~labels)
+    return tp, fp, fn, tn
+
+
+def precision_recall_f1(tp, fp, fn):
+    """Element-wise precision, recall and F1; 0 where undefined"""
+    tp, fp, fn = (np.asarray(x, dtype=np.float64) for x in (tp, fp, fn))
+    precision = np.divide(tp, tp + fp, out=np.zeros_like(tp), where=(tp + fp) > 0)
+    recall = np.divide(tp, tp + fn, out=np.zeros_like(tp), where=(tp + fn) > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros_like(tp), where=(precision + recall) > 0)
+    return precision, recall, f1
+
+
+def evaluate(probabilities, labels, exercise_index, threshold_matrix):
+    """
+    Per exercise-and-joint, per-joint, per-exercise and overall (micro-averaged)
+    precision/recall/F1 at the given thresholds. Returns a dict of arrays.
+    """
+    tp, fp, fn, tn = confusion_counts(probabilities, labels, exercise_index, threshold_matrix)
+    results = {"support": tp + fn, "windows": np.bincount(exercise_index, minlength=len(threshold_matrix))}
+    for name, axis in (("exercise_joint", None), ("joint", 0), ("exercise", 1), ("overall", (0, 1))):
+        counts = (tp, fp, fn) if axis is None else (tp.sum(axis=axis), fp.sum(axis=axis), fn.sum(axis=axis))
+        precision, recall, f1 = precision_recall_f1(*counts)
+        results[name] = {"precision": precision, "recall": recall, "f1": f1}
+    return results
+
+
+def sweep_thresholds(probabilities, labels, grid, chunk_size=64):
+    """
+    Precision, recall and F1 for every candidate threshold and joint, each
+    (len(grid), joints). The grid is broadcast against all windows at once,
+    in chunks of thresholds to bound memory.
+    """
+    labels = labels.astype(bool)
+    tp, fp, fn = [], [], []
+    for start in range(0, len(grid), chunk_size):
+        predicted = probabilities[np.newaxis] > grid[start:start + chunk_size, np.newaxis, np.newaxis]
+        tp.append((predicted & labels).sum(axis=1))
+        fp.append((predicted & ~labels).sum(axis=1))
+        fn.append((~predicted & labels).sum(axis=1))
+    return precision_recall_f1(np.concatenate(tp), np.concatenate(fp), np.concatenate(fn))
+
+
+def thresholds_path(model_path):
+    """Calibrated thresholds live next to the model they were calibrated for"""
+    return os.path.splitext(model_path)[0] + ".thresholds.json"
+
+
+def save_thresholds(path, thresholds, **metadata):
+    with open(path, "w") as f:
+        json.dump(dict(metadata, thresholds={name: [round(float(v), 6) for v in values] for name, values in thresholds.items()}),
+                  f, indent=2)
+
+
+def load_thresholds(path):
+    """Per-exercise threshold arrays from a calibration file, or {} if there is none"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {name: np.array(values) for name, values in json.load(f)["thresholds"].items()}
@@ -0,0 +1,70 @@
+import os
+import json
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXERCISES_PATH = os.path.join(ROOT_DIR, "exercises.json")
+
+
+class ExerciseRegistry:
+    """
+    The supported exercises, loaded from exercises.json.
+
+    Per-exercise data the video thread needs on every inference is compiled
+    into contiguous arrays indexed by exercise: encoding_matrix (E, 3) holds
+    the one-hot model inputs and threshold_matrix (E, joints) the default
+    per-joint thresholds. names/index map between names and rows. Adding an
+    exercise only needs an entry in the data file.
+    """
+
+    def __init__(self, path=EXERCISES_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.entries = data["exercises"]
+        self.names = [entry["name"] for entry in self.entries]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.joints = data["joints"]
+        self.default = data.get("default", self.names[0])
+
+        encodings = np.array([entry["encoding"] for entry in self.entries])
+        if len(self.index) != len(self.names) or len(set(encodings.tolist())) != len(encodings):
+            raise ValueError(f"Exercise names and encodings must be unique in {path}")
+        for entry in self.entries:
+            if len(entry["thresholds"]) != len(self.joints):
+                raise ValueError(f"{entry['name']} needs {len(self.joints)} thresholds in {path}")
+
+        self.encoding_matrix = np.eye(data["encoding_size"], dtype=np.float32)[encodings]
+        self.threshold_matrix = np.array([entry["thresholds"] for entry in self.entries], dtype=np.float64)
+        # Registry row of each one-hot position, for windows whose exercise is read from their encoding
+        self.from_encoding = np.full(data["encoding_size"], -1)
+        self.from_encoding[encodings] = np.arange(len(encodings))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, name):
+        return self.entries[self.index[name]]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def path(self, relative_path):
+        """Absolute path of an asset listed in the data file"""
+        return os.path.join(ROOT_DIR, relative_path)
+
+    def instructions(self, name):
+        return "".join(self[name].get("instructions", []))
+
+    def thresholds_with(self, overrides):
+        """Copy of threshold_matrix with the rows of the given exercises replaced"""
+        thresholds = self.threshold_matrix.copy()
+        for name, values in overrides.items():
+            if name in self.index:
+                thresholds[self.index[name]] = values
+            else:
+                print(f"Ignoring thresholds for unknown exercise '{name}'")
+        return thresholds
+
+
+REGISTRY = ExerciseRegistry()
@@ -0,0 +1,46 @@
+def get_evaluation_from_binary(binary_array, return_error_indices=False):
+    """
+    Returns a concise, grouped human-readable string for the flagged joints.
+    If return_error_indices=True, also returns a list of pose indices (11-16) that are erroneous.
+    """
+    joint_names = [
+        "Left Shoulder", "Right Shoulder", "Left Elbow", "Right Elbow", "Left Wrist", "Right Wrist"
+    ]
+    pose_indices = [11, 12, 13, 14, 15, 16]
+    arr = binary_array[0] if hasattr(binary_array, '__len__') and hasattr(binary_array[0], '__len__') else binary_array
+    if len(arr) != 6:
+        return ("Unknown error", []) if return_error_indices else "Unknown error"
+    # Indices for easier reference
+    ls, rs, le, re, lw, rw = arr
+    # All joints
+    if all(arr):
+        label = "Upper Extremity"
+    elif ls and rs and not (le or re or lw or rw):
+        label = "Spine"
+    elif le and re and not (ls or rs or lw or rw):
+        label = "Both Elbows"
+    elif lw and rw and not (ls or rs or le or re):
+        label = "Both Wrists"
+    elif le and lw and not (ls or rs or re or rw):
+        label = "Left Forearm"
+    elif re and rw and not (ls or rs or le or lw):
+        label = "Right Forearm"
+    elif ls and le and lw and not (rs or re or rw):
+        label = "Left Arm"
+    elif rs and re and rw and not (ls or le or lw):
+        label = "Right Arm"
+    elif ls and rs and (le or re or lw or rw) and not (not le and not re and not lw and not rw):
+        if le and re and lw and rw:
+            label = "Upper Extremity"
+        else:
+            label = "Spine"
+    else:
+        error_labels = [name for bit, name in zip(arr, joint_names) if bit]
+        if not error_labels:
+            label = "Correct"
+        else:
+            label = ", ".join(error_labels)
+    error_indices = [pose_indices[i] for i, bit in enumerate(arr) if bit]
+    if return_error_indices:
+        return label, error_indices
+    return label
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class InferenceGate:
+    """
+    Decides whether a full window is worth running through the classifier.
+
+    A window is skipped, and the last prediction reused, when:
+    - the tracked joints were barely visible over the window, or
+    - the patient was standing still (low motion energy between frames)
+
+    Counters of executed and skipped invokes make the savings measurable.
+    """
+
+    def __init__(self, min_visibility=0.5, min_motion=0.003, enabled=True):
+        # min_visibility: mean min(visibility, presence) of the tracked joints over the window
+        # min_motion: mean absolute frame-to-frame x/y displacement, in normalized units
+        self.min_visibility = min_visibility
+        self.min_motion = min_motion
+        self.enabled = enabled
+        self.has_prediction = False
+        self.executed = 0
+        self.skipped_visibility = 0
+        self.skipped_motion = 0
+
+    def reset(self):
+        """Forget the last prediction, e.g. when the exercise changes"""
+        self.has_prediction = False
+
+    @staticmethod
+    def motion_energy(keypoint_window):
+        """
+        Mean absolute frame-to-frame displacement of the x/y keypoint coordinates.
+        keypoint_window: (T, 3 * joints) array of interleaved x, y, z coordinates
+        """
+        joints = keypoint_window.reshape(len(keypoint_window), -1, 3)[:, :, :2]
+        return float(np.abs(np.diff(joints, axis=0)).mean())
+
+    def should_invoke(self, keypoint_window, visibility_window):
+        """
+        Returns True if the classifier should run on this window.
+
+        keypoint_window: (T, 3 * joints) keypoints of the tracked joints
+        visibility_window: (T,) per-frame visibility score of the tracked joints
+        """
+        if self.enabled and self.has_prediction:
+            if float(np.mean(visibility_window)) < self.min_visibility:
+                self.skipped_visibility += 1
+                return False
+            if self.motion_energy(keypoint_window) < self.min_motion:
+                self.skipped_motion += 1
+                return False
+        # Always invoke until there is a prediction to reuse
+        self.executed += 1
+        self.has_prediction = True
+        return True
+
+    def stats(self):
+        """Counters of executed and skipped invokes"""
+        skipped = self.skipped_visibility + self.skipped_motion
+        total = self.executed + skipped
+        return {
+            "executed": self.executed,
+            "skipped": skipped,
+            "skipped_visibility": self.skipped_visibility,
+            "skipped_motion": self.skipped_motion,
+            "skip_rate": skipped / total if total else 0.0,
+        }
@@ -0,0 +1,168 @@
+import os
+import time
+from collections import deque
+
+
+class LatencyGovernor:
+    """
+    Adjusts the capture rate, pose working resolution and inference stride to hold
+    a target end-to-end latency.
+
+    Every frame the video thread records its measured stage latencies. Every
+    `interval` frames the governor compares the average end-to-end latency with
+    the target and moves one knob one step:
+    - Over budget (or CPU saturated): degrade the knob whose stage dominates
+      (pose resolution for pose, stride for inference, otherwise capture rate)
+    - Over budget for `downgrade_after` checks in a row with pose dominating:
+      switch to the next lighter pose model, if one was given. This is one-way,
+      since loading a model is too slow to flap between them.
+    - Well under budget: restore knobs toward their preferred values
+
+    Each change is appended to `decisions` so it can be logged.
+    """
+
+    def __init__(
+        self,
+        target_latency_ms=100.0,
+        fps=15,
+        fps_bounds=(8, 30),
+        pose_scale_bounds=(0.5, 1.0),
+        pose_scale_step=0.125,
+        stride_bounds=(10, 20),
+        interval=30,
+        headroom=0.7,
+        cpu_limit=0.9,
+        pose_model=None,
+        lighter_pose_models=(),
+        downgrade_after=3,
+    ):
+        self.target_latency_ms = target_latency_ms
+        self.fps_bounds = fps_bounds
+        self.pose_scale_bounds = pose_scale_bounds
+        self.pose_scale_step = pose_scale_step
+        self.stride_bounds = stride_bounds
+        self.interval = interval
+        self.headroom = headroom
+        self.cpu_limit = cpu_limit
+
+        # Preferred values are the starting point; the governor never goes above them
+        self.preferred_fps = fps
+        self.target_fps = fps
+        self.pose_scale = pose_scale_bounds[1]
+        self.inference_stride = stride_bounds[0]
+        self.pose_model = pose_model
+        self.lighter_pose_models = list(lighter_pose_models)
+        self.downgrade_after = downgrade_after
+        self._overruns = 0
+
+        self.pose_ms = deque(maxlen=interval)
+        self.inference_ms = deque(maxlen=interval)
+        self.latency_ms = deque(maxlen=interval)
+        self.decisions = deque(maxlen=100)
+        self._frames = 0
+
+        self._cpu_count = os.cpu_count() or 1
+        self._last_wall = time.perf_counter()
+        self._last_cpu = time.process_time()
+        self.cpu_load = 0.0
+
+    def reset(self):
+        """Return the knobs to their preferred values and forget the measurements"""
+        self.target_fps = self.preferred_fps
+        self.pose_scale = self.pose_scale_bounds[1]
+        self.inference_stride = self.stride_bounds[0]
+        self.pose_ms.clear()
+        self.inference_ms.clear()
+        self.latency_ms.clear()
+        self._frames = 0
+        self._overruns = 0
+
+    def record(self, pose_ms, inference_ms, latency_ms):
+        """Record the stage latencies of one frame. inference_ms is 0 when no inference ran."""
+        self.pose_ms.append(pose_ms)
+        self.inference_ms.append(inference_ms)
+        self.latency_ms.append(latency_ms)
+        self._frames += 1
+
+    def _measure_cpu_load(self):
+        # Fraction of all cores used by this process since the last measurement
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        elapsed = wall - self._last_wall
+        if elapsed > 0:
+            self.cpu_load = (cpu - self._last_cpu) / (elapsed * self._cpu_count)
+        self._last_wall = wall
+        self._last_cpu = cpu
+        return self.cpu_load
+
+    def update(self):
+        """
+        Re-evaluate the settings once every `interval` frames.
+        Returns the decision dict if a knob changed, otherwise None.
+        """
+        if self._frames < self.interval:
+            return None
+        self._frames = 0
+
+        latency = sum(self.latency_ms) / len(self.latency_ms)
+        pose = sum(self.pose_ms) / len(self.pose_ms)
+        # Inference cost amortized over all frames of the window
+        inference = sum(self.inference_ms) / len(self.inference_ms)
+        cpu_load = self._measure_cpu_load()
+
+        over_budget = latency > self.target_latency_ms or cpu_load > self.cpu_limit
+        under_budget = latency < self.target_latency_ms * self.headroom and cpu_load < self.cpu_limit * self.headroom
+
+        self._overruns = self._overruns + 1 if over_budget else 0
+
+        action = None
+        if over_budget:
+            action = self._degrade(pose, inference)
+        elif under_budget:
+            action = self._restore()
+        if action is None:
+            return None
+
+        decision = {
+            "time": time.time(),
+            "action": action,
+            "latency_ms": round(latency, 1),
+            "pose_ms": round(pose, 1),
+            "inference_ms": round(inference, 1),
+            "cpu_load": round(cpu_load, 2),
+            "target_fps": self.target_fps,
+            "pose_scale": self.pose_scale,
+            "inference_stride": self.inference_stride,
+            "pose_model": self.pose_model,
+        }
+        self.decisions.append(decision)
+        return decision
+
+    def _degrade(self, pose, inference):
+        if pose >= inference and self._overruns >= self.downgrade_after and self.lighter_pose_models:
+            self.pose_model = self.lighter_pose_models.pop(0)
+            self._overruns = 0
+            return "lower pose model"
+        if pose >= inference and self.pose_scale > self.pose_scale_bounds[0]:
+            self.pose_scale = max(self.pose_scale_bounds[0], self.pose_scale - self.pose_scale_step)
+            return "lower pose resolution"
+        if inference > pose and self.inference_stride < self.stride_bounds[1]:
+            self.inference_stride += 1
+            return "raise inference stride"
+        if self.target_fps > self.fps_bounds[0]:
+            self.target_fps -= 1
+            return "lower capture rate"
+        return None
+
+    def _restore(self):
+        # Restore in reverse order of degradation
+        if self.target_fps < min(self.preferred_fps, self.fps_bounds[1]):
+            self.target_fps += 1
+            return "raise capture rate"
+        if self.inference_stride > self.stride_bounds[0]:
+            self.inference_stride -= 1
+            return "lower inference stride"
+        if self.pose_scale < self.pose_scale_bounds[1]:
+            self.pose_scale = min(self.pose_scale_bounds[1], self.pose_scale + self.pose_scale_step)
+            return "raise pose resolution"
+        return None
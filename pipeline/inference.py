@@ -0,0 +1,267 @@
+import os
+import time
+import threading
+
+import numpy as np
+
+
+# Interpreter backends in order of preference. The standalone runtimes load in a
+# fraction of the time and memory of full TensorFlow, but cannot run models that
+# need Flex (select TF) ops, so tf.lite stays as the fallback.
+def _load_litert():
+    from ai_edge_litert.interpreter import Interpreter, OpResolverType
+
+    return Interpreter, OpResolverType
+
+
+def _load_tflite_runtime():
+    from tflite_runtime.interpreter import Interpreter, OpResolverType
+
+    return Interpreter, OpResolverType
+
+
+def _load_tensorflow():
+    import tensorflow as tf
+
+    return tf.lite.Interpreter, tf.lite.experimental.OpResolverType
+
+
+BACKENDS = (
+    ("litert", _load_litert),
+    ("tflite_runtime", _load_tflite_runtime),
+    ("tensorflow", _load_tensorflow),
+)
+
+# Backend that successfully ran each model, so failing backends are tried only once
+_model_backends = {}
+
+
+def create_interpreter(model_path, num_threads=None, xnnpack=True, backend=None):
+    """
+    Builds and allocates an interpreter with the first backend that is installed
+    and can run the model. Returns (backend name, interpreter).
+    backend: force a specific backend by name
+    """
+    preferred = backend or _model_backends.get(model_path)
+    errors = []
+    for name, load in BACKENDS:
+        if preferred and name != preferred:
+            continue
+        try:
+            Interpreter, OpResolverType = load()
+        except ImportError:
+            continue
+        # AUTO applies the default XNNPACK delegate; the other resolver leaves it out
+        op_resolver_type = (
+            OpResolverType.AUTO if xnnpack else OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        )
+        try:
+            interpreter = Interpreter(
+                model_path=model_path,
+                num_threads=num_threads,
+                experimental_op_resolver_type=op_resolver_type,
+            )
+            interpreter.allocate_tensors()
+        except (RuntimeError, ValueError) as e:
+            # e.g. Flex ops are only available with full TensorFlow
+            errors.append(f"{name}: {str(e).splitlines()[0]}")
+            continue
+        _model_backends[model_path] = name
+        return name, interpreter
+    if preferred and not backend:
+        # The remembered backend is gone; search again
+        del _model_backends[model_path]
+        return create_interpreter(model_path, num_threads, xnnpack)
+    raise RuntimeError(f"No TFLite backend could load {model_path}: {'; '.join(errors) or 'none installed'}")
+
+
+class InferenceEngine:
+    """
+    Wraps a TFLite interpreter for the pose classifier, created with the lightest
+    backend that can run the model (see create_interpreter).
+
+    Tensor indices and shapes are resolved once. Windows are written straight into
+    the interpreter's input buffer and outputs are read from its output buffer
+    through interpreter.tensor() views, so the hot path makes no intermediate copies.
+
+    The interpreter refuses to invoke while a view of its buffers is alive, so views
+    are only ever held as temporaries: never keep the array returned by
+    input_window() or invoke() past the next call to invoke().
+
+    batch_size > 1 resizes the input to (batch_size, T, features) once, for
+    scoring several windows per invoke with write_batch().
+
+    load_async() prepares another model on a background thread while this one
+    keeps serving; apply_pending() swaps it in between windows.
+    """
+
+    def __init__(self, model_path, num_threads=None, xnnpack=True, backend=None, batch_size=1):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.xnnpack = xnnpack
+        self.backend, self.interpreter = create_interpreter(model_path, num_threads, xnnpack, backend)
+
+        if batch_size != 1:
+            input_details = self.interpreter.get_input_details()[0]
+            self.interpreter.resize_tensor_input(
+                input_details['index'], [batch_size] + list(input_details['shape'][1:])
+            )
+            self.interpreter.allocate_tensors()
+
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self.input_index = input_details['index']
+        self.output_index = output_details['index']
+        self.input_shape = tuple(input_details['shape'])
+        # Batch size from the input; the output shape may only update on the first invoke
+        self.output_shape = (self.input_shape[0],) + tuple(output_details['shape'][1:])
+        self.input_dtype = input_details['dtype']
+        self.output_dtype = output_details['dtype']
+        self.input_quantization = input_details['quantization']
+        self.output_quantization = output_details['quantization']
+
+        # Zero-copy access is only possible when no (de)quantization is needed
+        self.input_is_float = self.input_dtype == np.float32
+        self.output_is_float = self.output_dtype == np.float32
+
+        # Callables returning views of the interpreter's buffers
+        self._input = self.interpreter.tensor(self.input_index)
+        self._output = self.interpreter.tensor(self.output_index)
+
+        # Model hot-swap state
+        self.loading = False
+        self.last_swap = None
+        self._pending = None
+        self._swap_lock = threading.Lock()
+        # Incremented by every load_async(); only the latest request may be swapped in
+        self._generation = 0
+
+    def input_window(self):
+        """
+        The window currently in the input buffer, shape (T, features).
+        A view for float models, a dequantized copy otherwise.
+        """
+        if self.input_is_float:
+            return self._input()[0]
+        scale, zero_point = self.input_quantization
+        return (self._input()[0].astype(np.float32) - zero_point) * scale
+
+    def write_window(self, frames):
+        """
+        Assemble a window directly into the input buffer.
+        frames: sequence of T per-frame feature vectors (e.g. the keypoint deque)
+        """
+        if self.input_is_float:
+            np.stack(frames, out=self._input()[0])
+        else:
+            self._input()[0] = self._quantize(np.stack(frames))
+
+    def write_batch(self, windows):
+        """Copy a (batch_size, T, features) array of windows into the input buffer"""
+        if self.input_is_float:
+            self._input()[...] = windows
+        else:
+            self._input()[...] = self._quantize(windows)
+
+    def _quantize(self, values):
+        scale, zero_point = self.input_quantization
+        info = np.iinfo(self.input_dtype)
+        return np.clip(np.round(values / scale + zero_point), info.min, info.max)
+
+    def invoke(self):
+        """
+        Runs the model on the current input buffer and returns the output
+        probabilities, shape (batch_size, joints). The returned array is a view of the
+        output buffer when the model has float outputs.
+        """
+        self.interpreter.invoke()
+        if self.output_is_float:
+            return self._output()
+        scale, zero_point = self.output_quantization
+        return (self._output().astype(np.float32) - zero_point) * scale
+
+    def load_async(self, model_path, tune=None, warmup=3):
+        """
+        Builds and warms an interpreter for model_path on a background thread,
+        keeping the batch size. This engine keeps serving the current model
+        until apply_pending() is called.
+        tune: optional callable(model_path) -> dict of num_threads/xnnpack, run on that thread
+
+        A later call supersedes this one: its result is discarded, even if it
+        finishes last, and any model already waiting to be swapped in is dropped.
+        """
+        requested = time.perf_counter()
+        with self._swap_lock:
+            self._generation += 1
+            generation = self._generation
+            self._pending = None
+            self.loading = True
+
+        def load():
+            replacement = None
+            try:
+                settings = tune(model_path) if tune else {"num_threads": self.num_threads, "xnnpack": self.xnnpack}
+                replacement = InferenceEngine(model_path, batch_size=self.input_shape[0], **settings)
+                # The first invokes allocate scratch buffers and pick kernels
+                windows = np.zeros(replacement.input_shape, dtype=np.float32)
+                for _ in range(warmup):
+                    replacement.write_batch(windows)
+                    replacement.invoke()
+            except Exception as e:
+                print(f"Could not load {model_path}: {e}")
+                replacement = None
+            finally:
+                with self._swap_lock:
+                    if generation != self._generation:
+                        print(f"Discarding {os.path.basename(model_path)}: a newer model was requested")
+                    else:
+                        if replacement is not None:
+                            self._pending = (replacement, time.perf_counter() - requested)
+                        self.loading = False
+
+        thread = threading.Thread(target=load, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def has_pending(self):
+        """True once a model started with load_async() is loaded and warm"""
+        return self._pending is not None
+
+    def pending_model_path(self):
+        """Path of the model waiting to be swapped in, or None"""
+        pending = self._pending
+        return pending[0].model_path if pending is not None else None
+
+    def discard_pending(self):
+        """Drops a loaded model instead of swapping it in"""
+        with self._swap_lock:
+            self._pending = None
+
+    def apply_pending(self):
+        """
+        Swaps in the model prepared by load_async(), if it is ready. Call it from
+        the thread that invokes, between windows. Returns True if it swapped.
+        """
+        with self._swap_lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return False
+        replacement, ready_seconds = pending
+        start = time.perf_counter()
+        previous = self.model_path
+        # Take over the replacement's interpreter and tensor metadata in one step
+        # Load state stays with this engine, which may already be loading a newer model
+        state = {key: value for key, value in vars(replacement).items()
+                 if key not in ("_swap_lock", "_pending", "_generation", "loading", "last_swap")}
+        vars(self).update(state)
+        self.last_swap = {
+            "from": os.path.basename(previous),
+            "to": os.path.basename(self.model_path),
+            "ready_ms": 1000.0 * ready_seconds,
+            "swap_ms": 1000.0 * (time.perf_counter() - start),
+        }
+        print(
+            f"Swapped {self.last_swap['from']} -> {self.last_swap['to']}: loaded and warmed in "
+            f"{self.last_swap['ready_ms']:.0f} ms, swapped in {self.last_swap['swap_ms']:.3f} ms"
+        )
+        return True
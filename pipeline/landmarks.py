@@ -0,0 +1,34 @@
+import numpy as np
+
+# Column layout of the arrays returned by landmarks_to_array
+X, Y, Z, VISIBILITY, PRESENCE = range(5)
+
+
+def _score(value):
+    return 1.0 if value is None else value
+
+
+def landmarks_to_array(landmarks):
+    """
+    Converts a pose landmark list into a (N, 5) float32 array of
+    x, y, z, visibility and presence in a single pass.
+    Landmarks that do not report visibility/presence are treated as fully visible.
+
+    landmarks: Can be either MediaPipe Pose Solution landmarks (has .landmark attribute)
+              or MediaPipe Tasks landmarks (direct list of landmarks)
+    """
+    if hasattr(landmarks, 'landmark'):
+        landmarks = landmarks.landmark
+    return np.array(
+        [
+            (
+                lm.x,
+                lm.y,
+                lm.z,
+                _score(getattr(lm, 'visibility', None)),
+                _score(getattr(lm, 'presence', None)),
+            )
+            for lm in landmarks
+        ],
+        dtype=np.float32,
+    ).reshape(-1, 5)
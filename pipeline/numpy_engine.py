@@ -0,0 +1,280 @@
+import io
+import re
+import json
+import zipfile
+
+import h5py
+import numpy as np
+
+
+def _snake_case(name):
+    # Same naming Keras uses for the weight groups in model.weights.h5
+    name = re.sub(r"\W+", "", name)
+    name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
+    return re.sub("([a-z])([A-Z])", r"\1_\2", name).lower()
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+}
+
+
+def _vars(group):
+    return [group["vars"][str(i)][()] for i in range(len(group["vars"]))]
+
+
+def positional_encoding_table(max_steps, d_model):
+    """Same table as architecture.custom_model.PositionalEncoding, shape (max_steps, d_model)"""
+    position = np.arange(max_steps, dtype=np.float32)[:, np.newaxis]
+    i = np.arange(d_model, dtype=np.float32)[np.newaxis, :]
+    angle_rates = 1 / np.power(np.float32(10000.0), (2 * (i // 2)) / np.float32(d_model))
+    angles = position * angle_rates
+    return np.concatenate([np.sin(angles[:, 0::2]), np.cos(angles[:, 1::2])], axis=-1).astype(np.float32)
+
+
+class _Layer:
+    def __init__(self, config, weights):
+        self.config = config
+
+    def __call__(self, *inputs):
+        raise NotImplementedError
+
+
+class _Identity(_Layer):
+    # InputLayer and Dropout (inference mode)
+    def __call__(self, x):
+        return x
+
+
+class _PositionalEncoding(_Layer):
+    def __init__(self, config, weights):
+        super().__init__(config, weights)
+        self.table = positional_encoding_table(config["max_steps"], config["d_model"])
+        self.bias = _vars(weights)[0] if config.get("use_learned_bias", True) else 0.0
+
+    def __call__(self, x):
+        return x + self.table[: x.shape[1]] + self.bias
+
+
+class _LayerNormalization(_Layer):
+    def __init__(self, config, weights):
+        super().__init__(config, weights)
+        self.gamma, self.beta = _vars(weights)
+        self.epsilon = config["epsilon"]
+
+    def __call__(self, x):
+        mean = x.mean(axis=-1, keepdims=True)
+        variance = x.var(axis=-1, keepdims=True)
+        return (x - mean) / np.sqrt(variance + self.epsilon) * self.gamma + self.beta
+
+
+class _BatchNormalization(_Layer):
+    def __init__(self, config, weights):
+        super().__init__(config, weights)
+        gamma, beta, mean, variance = _vars(weights)
+        # Fold the moving statistics into one scale and offset
+        self.scale = gamma / np.sqrt(variance + config["epsilon"])
+        self.offset = beta - mean * self.scale
+
+    def __call__(self, x):
+        return x * self.scale + self.offset
+
+
+class _Dense(_Layer):
+    def __init__(self, config, weights):
+        super().__init__(config, weights)
+        self.kernel, self.bias = _vars(weights)
+        self.activation = ACTIVATIONS[config["activation"]]
+
+    def __call__(self, x):
+        return self.activation(x @ self.kernel + self.bias)
+
+
+class _LSTM:
+    def __init__(self, config, cell):
+        self.units = config["units"]
+        self.go_backwards = config["go_backwards"]
+        self.kernel, self.recurrent_kernel, self.bias = _vars(cell)
+        self.activation = ACTIVATIONS[config["activation"]]
+        self.recurrent_activation = ACTIVATIONS[config["recurrent_activation"]]
+
+    def __call__(self, x):
+        batch, steps, _ = x.shape
+        units = self.units
+        # Input projections for all time steps at once; gates are ordered i, f, c, o
+        projected = x @ self.kernel + self.bias
+        if self.go_backwards:
+            projected = projected[:, ::-1]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32)
+        for t in range(steps):
+            z = projected[:, t] + h @ self.recurrent_kernel
+            i = self.recurrent_activation(z[:, :units])
+            f = self.recurrent_activation(z[:, units:2 * units])
+            g = self.activation(z[:, 2 * units:3 * units])
+            o = self.recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * self.activation(c)
+            outputs[:, t] = h
+        return outputs
+
+
+class _Bidirectional(_Layer):
+    def __init__(self, config, weights):
+        super().__init__(config, weights)
+        layer_config = config["layer"]["config"]
+        backward_config = dict(layer_config, go_backwards=not layer_config["go_backwards"])
+        if config.get("backward_layer"):
+            backward_config = config["backward_layer"]["config"]
+        self.forward = _LSTM(layer_config, weights["forward_layer"]["cell"])
+        self.backward = _LSTM(backward_config, weights["backward_layer"]["cell"])
+        if config["merge_mode"] != "concat":
+            raise ValueError(f"Unsupported merge_mode {config['merge_mode']}")
+
+    def __call__(self, x):
+        # The backward outputs are reversed back into input time order
+        return np.concatenate([self.forward(x), self.backward(x)[:, ::-1]], axis=-1)
+
+
+class _MultiHeadAttention(_Layer):
+    def __init__(self, config, weights):
+        super().__init__(config, weights)
+        self.wq, self.bq = _vars(weights["query_dense"])
+        self.wk, self.bk = _vars(weights["key_dense"])
+        self.wv, self.bv = _vars(weights["value_dense"])
+        self.wo, self.bo = _vars(weights["output_dense"])
+        self.scale = 1.0 / np.sqrt(np.float32(config["key_dim"]))
+
+    def __call__(self, query, value, key=None):
+        key = value if key is None else key
+        q = (np.einsum("btd,dhk->bthk", query, self.wq) + self.bq) * self.scale
+        k = np.einsum("btd,dhk->bthk", key, self.wk) + self.bk
+        v = np.einsum("btd,dhk->bthk", value, self.wv) + self.bv
+        scores = np.einsum("bshk,bthk->bhts", k, q)
+        scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+        probs = scores / scores.sum(axis=-1, keepdims=True)
+        attended = np.einsum("bhts,bshk->bthk", probs, v)
+        return np.einsum("bthk,hkd->btd", attended, self.wo) + self.bo
+
+
+class _Add(_Layer):
+    def __call__(self, *inputs):
+        return sum(inputs[1:], inputs[0])
+
+
+class _Multiply(_Layer):
+    def __call__(self, *inputs):
+        output = inputs[0]
+        for x in inputs[1:]:
+            output = output * x
+        return output
+
+
+class _Concatenate(_Layer):
+    def __call__(self, *inputs):
+        return np.concatenate(inputs, axis=self.config.get("axis", -1))
+
+
+class _GlobalAveragePooling1D(_Layer):
+    def __call__(self, x):
+        return x.mean(axis=1)
+
+
+LAYERS = {
+    "InputLayer": _Identity,
+    "Dropout": _Identity,
+    "PositionalEncoding": _PositionalEncoding,
+    "LayerNormalization": _LayerNormalization,
+    "BatchNormalization": _BatchNormalization,
+    "Dense": _Dense,
+    "Bidirectional": _Bidirectional,
+    "MultiHeadAttention": _MultiHeadAttention,
+    "Add": _Add,
+    "Multiply": _Multiply,
+    "Concatenate": _Concatenate,
+    "GlobalAveragePooling1D": _GlobalAveragePooling1D,
+}
+
+
+def _inbound_names(node):
+    # Names of the layers feeding a node, in argument order
+    names = []
+    if isinstance(node, dict):
+        if node.get("class_name") == "__keras_tensor__":
+            return [node["config"]["keras_history"][0]]
+        for value in node.values():
+            names += _inbound_names(value)
+    elif isinstance(node, list):
+        for value in node:
+            names += _inbound_names(value)
+    return names
+
+
+class NumpyEngine:
+    """
+    Pure-NumPy forward pass of the exported classifiers, for environments where
+    even a TFLite runtime is too heavy.
+
+    Reads the functional graph from the .keras archive's config.json and the
+    weights from its model.weights.h5, and runs the layers in topological order.
+    predict() takes batched (N, T, 21) input; write_window()/invoke() mirror
+    InferenceEngine so it can be used in its place.
+    """
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        with zipfile.ZipFile(model_path) as archive:
+            config = json.loads(archive.read("config.json"))["config"]
+            weights_file = io.BytesIO(archive.read("model.weights.h5"))
+        with h5py.File(weights_file, "r") as weights:
+            self._build(config, weights["layers"])
+
+        self.input_shape = (1,) + tuple(config["layers"][0]["config"]["batch_shape"][1:])
+        self.backend = "numpy"
+        self._input = np.zeros(self.input_shape, dtype=np.float32)
+
+    def _build(self, config, weights):
+        self.nodes = []
+        used_names = {}
+        for layer in config["layers"]:
+            class_name = layer["class_name"]
+            if class_name not in LAYERS:
+                raise ValueError(f"Unsupported layer {class_name} ({layer['name']})")
+            # Weight groups are named by class with a per-class counter
+            group = _snake_case(class_name)
+            if group in used_names:
+                used_names[group] += 1
+                group = f"{group}_{used_names[group]}"
+            else:
+                used_names[group] = 0
+            layer_weights = weights[group] if group in weights else None
+            inbound = _inbound_names(layer.get("inbound_nodes", []))
+            self.nodes.append((layer["name"], LAYERS[class_name](layer["config"], layer_weights), inbound))
+        self.input_name = config["input_layers"][0][0]
+        self.output_name = config["output_layers"][0][0]
+
+    def predict(self, windows):
+        """Per-joint probabilities for a batch of windows, (N, T, features) -> (N, joints)"""
+        values = {self.input_name: np.asarray(windows, dtype=np.float32)}
+        for name, layer, inbound in self.nodes:
+            if not inbound:
+                continue
+            values[name] = layer(*(values[source] for source in inbound))
+        return values[self.output_name]
+
+    def input_window(self):
+        return self._input[0]
+
+    def write_window(self, frames):
+        np.stack(frames, out=self._input[0])
+
+    def invoke(self):
+        return self.predict(self._input)
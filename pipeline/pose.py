@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import threading
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(ROOT_DIR, "models")
+POSE_MODEL_PATH = os.path.join(MODELS_DIR, "pose_landmarker_full.task")
+SELECTION_CACHE_PATH = os.path.join(MODELS_DIR, ".pose_selection.json")
+
+# BlazePose variants, most accurate (and slowest) first
+POSE_VARIANTS = ("heavy", "full", "lite")
+# Share of the frame budget the pose model may use; the rest is capture, drawing and inference
+POSE_BUDGET_SHARE = 0.6
+
+# .task bytes read this process, by absolute path, so every landmarker shares one copy
+_model_buffers = {}
+_model_buffers_lock = threading.Lock()
+
+
+def load_pose_model(model_path=POSE_MODEL_PATH):
+    """
+    The .task file's bytes, read from disk on first use only. Relative paths
+    are resolved against the repository, not the working directory.
+    """
+    if not os.path.isabs(model_path):
+        model_path = os.path.join(ROOT_DIR, model_path)
+    model_path = os.path.normpath(model_path)
+    with _model_buffers_lock:
+        if model_path not in _model_buffers:
+            with open(model_path, "rb") as f:
+                _model_buffers[model_path] = f.read()
+        return _model_buffers[model_path]
+
+
+def create_pose_landmarker(model_path=POSE_MODEL_PATH, **options):
+    """
+    An IMAGE mode PoseLandmarker built from the shared in-memory model, so
+    landmarkers per rep, camera or worker start without touching the disk.
+    options are passed on to PoseLandmarkerOptions.
+    """
+    import mediapipe as mp
+
+    options.setdefault("running_mode", mp.tasks.vision.RunningMode.IMAGE)
+    return mp.tasks.vision.PoseLandmarker.create_from_options(
+        mp.tasks.vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_buffer=load_pose_model(model_path)),
+            **options,
+        )
+    )
+
+
+def pose_model_path(variant):
+    return os.path.join(MODELS_DIR, f"pose_landmarker_{variant}.task")
+
+
+def available_pose_variants():
+    """The variants whose .task file is present, most accurate first"""
+    return [variant for variant in POSE_VARIANTS if os.path.exists(pose_model_path(variant))]
+
+
+def _benchmark_frame(width, height):
+    # A frame with a person in it, so the landmark model runs and not just the detector
+    import cv2
+    from pipeline.exercises import REGISTRY
+
+    for entry in REGISTRY.entries:
+        image = cv2.imread(REGISTRY.path(entry["image"])) if "image" in entry else None
+        if image is not None:
+            return np.ascontiguousarray(cv2.cvtColor(cv2.resize(image, (width, height)), cv2.COLOR_BGR2RGB))
+    return np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def benchmark_pose_model(model_path, frame, iterations=20, warmup=3):
+    """Median detect() latency of the model on the frame, in milliseconds"""
+    import mediapipe as mp
+
+    landmarker = create_pose_landmarker(model_path, num_poses=1)
+    image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame)
+    try:
+        for _ in range(warmup):
+            landmarker.detect(image)
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            landmarker.detect(image)
+            samples.append(time.perf_counter() - start)
+    finally:
+        landmarker.close()
+    return float(np.median(samples)) * 1000.0
+
+
+def pose_latencies(width, height, cache_path=SELECTION_CACHE_PATH):
+    """
+    {variant: detect() ms at this resolution} for every available variant.
+    Measured once per (model file, CPU model, resolution) and cached in
+    cache_path, so only the first launch on a machine pays for it. Files are
+    identified by path, size and modification time; hashing tens of MB of
+    .task files would cost every session start.
+    """
+    from pipeline.tuning import cpu_model
+
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    latencies = {}
+    frame = None
+    for variant in available_pose_variants():
+        model_path = pose_model_path(variant)
+        stat = os.stat(model_path)
+        key = f"{model_path}|{stat.st_size}|{stat.st_mtime_ns}|{cpu_model()}|{width}x{height}"
+        if key not in cache:
+            if frame is None:
+                frame = _benchmark_frame(width, height)
+            print(f"Benchmarking pose_landmarker_{variant} at {width}x{height}...")
+            cache[key] = {"variant": variant, "latency_ms": benchmark_pose_model(model_path, frame)}
+        latencies[variant] = cache[key]["latency_ms"]
+
+    if frame is not None:
+        try:
+            with open(cache_path, "w") as f:
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            print(f"Could not write pose selection cache {cache_path}: {e}")
+    return latencies
+
+
+def select_pose_variant(target_fps, width, height, budget_share=POSE_BUDGET_SHARE, cache_path=SELECTION_CACHE_PATH):
+    """
+    The most accurate available variant whose measured latency fits its share
+    of the 1 / target_fps frame budget; the fastest one if none fits.
+    Returns (variant, {variant: ms}), or ("full", {}) if no variant is present.
+    """
+    latencies = pose_latencies(width, height, cache_path)
+    if not latencies:
+        return "full", latencies
+    budget_ms = 1000.0 / target_fps * budget_share
+    for variant in POSE_VARIANTS:
+        if variant in latencies and latencies[variant] <= budget_ms:
+            return variant, latencies
+    return min(latencies, key=latencies.get), latencies
+
+
+def lighter_variants(variant):
+    """The available variants faster than the given one, next-lighter first"""
+    available = available_pose_variants()
+    return [v for v in POSE_VARIANTS[POSE_VARIANTS.index(variant) + 1:] if v in available]
@@ -0,0 +1,59 @@
+from collections import Counter, deque
+
+import numpy as np
+
+
+class ExerciseRecognizer:
+    """
+    Infers which exercise is being performed by scoring the current window
+    under every exercise encoding at once.
+
+    The window is copied once into each row of an (E, T, features) batch, the
+    rows get their exercise's one-hot encoding, and the batch runs in a single
+    invoke of an engine created with batch_size=E. The classifier was trained
+    to flag joints that deviate from the encoded exercise, so the encoding
+    whose probabilities sit furthest below its thresholds is taken as the
+    exercise. A majority vote over the last few windows keeps it from
+    flickering.
+    """
+
+    def __init__(self, engine, encoding_matrix, threshold_matrix, history=5):
+        if engine.input_shape[0] != len(encoding_matrix):
+            raise ValueError(f"Engine batch size {engine.input_shape[0]} != {len(encoding_matrix)} exercises")
+        self.engine = engine
+        self.encoding_matrix = encoding_matrix
+        self.threshold_matrix = threshold_matrix
+        self.encoding_size = encoding_matrix.shape[1]
+        self.votes = deque(maxlen=history)
+        self.current = None
+        self._batch = np.empty(engine.input_shape, dtype=np.float32)
+
+    def reset(self):
+        self.votes.clear()
+        self.current = None
+
+    def score(self, frames):
+        """
+        Probabilities for the window under every exercise, shape (E, joints).
+        frames: sequence of T per-frame feature vectors (e.g. the keypoint deque)
+        """
+        self._batch[:] = np.stack(frames)
+        self._batch[:, :, :self.encoding_size] = self.encoding_matrix[:, np.newaxis, :]
+        self.engine.write_batch(self._batch)
+        # Copied, so the output buffer is free for the next invoke
+        return np.array(self.engine.invoke())
+
+    def recognize(self, frames):
+        """
+        Scores the window and returns (exercise index, probabilities under that
+        exercise's encoding). The index is the majority of the recent votes.
+        """
+        probabilities = self.score(frames)
+        # Mean probability relative to each exercise's own thresholds; lowest wins
+        deviation = (probabilities / self.threshold_matrix).mean(axis=1)
+        self.votes.append(int(deviation.argmin()))
+        winner, count = Counter(self.votes).most_common(1)[0]
+        # Switch only on a strict majority, so ties keep the current exercise
+        if self.current is None or (winner != self.current and count * 2 > len(self.votes)):
+            self.current = winner
+        return self.current, probabilities[self.current]
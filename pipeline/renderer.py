@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+
+# BGR format colors for OpenCV
+RED = (182, 0, 18)
+GREEN = (101, 184, 101)
+
+# Upper body keypoints (11-24) and the connections drawn between them
+UPPER_BODY_INDICES = np.arange(11, 25)
+UPPER_BODY_CONNECTIONS = (
+    (11, 12),  # Shoulders
+    (11, 13),
+    (13, 15),  # Left arm
+    (12, 14),
+    (14, 16),  # Right arm
+    (11, 23),
+    (12, 24),  # Hip connections
+    (23, 24),  # Hip line
+)
+
+
+class SkeletonRenderer:
+    """
+    Draws the upper body skeleton in place with color coding:
+    - Red for connections/keypoints in error_indices
+    - Green otherwise
+
+    Pixel coordinates are computed for all keypoints in one vectorized step
+    and connections are drawn with one cv2.polylines call per color.
+    """
+
+    def __init__(self, display_size=None, point_radius=7, line_thickness=4, buffer_count=3):
+        # display_size: (width, height) of the downscaled display buffer, or None
+        # to draw on a full resolution copy of the capture frame
+        self.display_size = display_size
+        self.point_radius = point_radius
+        self.line_thickness = line_thickness
+
+        # Connection topology is resolved once into rows of the keypoint table
+        row_of = {idx: row for row, idx in enumerate(UPPER_BODY_INDICES)}
+        self._connection_rows = np.array(
+            [(row_of[a], row_of[b]) for a, b in UPPER_BODY_CONNECTIONS], dtype=np.intp
+        )
+        self._max_index = int(UPPER_BODY_INDICES.max())
+
+        # Preallocated buffers, rebuilt only when the frame shape changes
+        self._error_lookup = np.zeros(self._max_index + 1, dtype=bool)
+        self._pixels = np.empty((len(UPPER_BODY_INDICES), 2), dtype=np.int32)
+        self._buffer_count = buffer_count
+        self._buffers = []
+        self._buffer_idx = 0
+        self._scaled = None
+        self._scale = 1.0
+
+    def _next_buffer(self, shape):
+        if not self._buffers or self._buffers[0].shape != shape:
+            self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self._buffer_count)]
+            self._buffer_idx = 0
+        buffer = self._buffers[self._buffer_idx]
+        self._buffer_idx = (self._buffer_idx + 1) % self._buffer_count
+        return buffer
+
+    def mirror(self, frame_rgb):
+        """
+        Returns a horizontally flipped (and optionally downscaled) copy of the frame
+        written into the next display buffer. Buffers are rotated so a frame still
+        being shown by the UI thread is not overwritten by the next one.
+        """
+        source = frame_rgb
+        if self.display_size is not None:
+            width, height = self.display_size
+            self._scale = width / frame_rgb.shape[1]
+            if self._scaled is None or self._scaled.shape[:2] != (height, width):
+                self._scaled = np.empty((height, width, frame_rgb.shape[2]), dtype=np.uint8)
+            cv2.resize(frame_rgb, (width, height), dst=self._scaled, interpolation=cv2.INTER_AREA)
+            source = self._scaled
+        output = self._next_buffer(source.shape)
+        cv2.flip(source, 1, dst=output)
+        return output
+
+    def draw(self, image, landmark_array, error_indices=()):
+        """
+        Draws on image in place.
+
+        landmark_array: (N, >=2) array of normalized landmark coordinates, as returned
+                        by pipeline.landmarks.landmarks_to_array
+        Note: Image should already be flipped for correct display
+        """
+        if len(landmark_array) <= self._max_index:
+            return image
+        height, width = image.shape[:2]
+        radius = max(1, int(round(self.point_radius * self._scale)))
+        thickness = max(1, int(round(self.line_thickness * self._scale)))
+
+        # Convert normalized coordinates to pixel values in one step
+        # Flip X coordinate since the image is already flipped
+        xy = landmark_array[UPPER_BODY_INDICES, :2]
+        self._pixels[:, 0] = (1.0 - xy[:, 0]) * width
+        self._pixels[:, 1] = xy[:, 1] * height
+
+        self._error_lookup[:] = False
+        if error_indices:
+            self._error_lookup[list(error_indices)] = True
+        point_errors = self._error_lookup[UPPER_BODY_INDICES]
+
+        # Draw keypoints
+        for (x, y), is_error in zip(self._pixels.tolist(), point_errors.tolist()):
+            cv2.circle(image, (x, y), radius, RED if is_error else GREEN, -1)
+
+        # Draw connections, one polylines call per color
+        segments = self._pixels[self._connection_rows]
+        segment_errors = point_errors[self._connection_rows].any(axis=1)
+        for mask, color in ((~segment_errors, GREEN), (segment_errors, RED)):
+            if mask.any():
+                cv2.polylines(image, segments[mask], False, color, thickness)
+
+        return image
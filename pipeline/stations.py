@@ -0,0 +1,161 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from pipeline.exercises import REGISTRY
+from pipeline.gating import InferenceGate
+from pipeline.inference import InferenceEngine
+from pipeline.landmarks import X, Y, VISIBILITY, PRESENCE
+
+KEYPOINTS_OF_INTEREST = np.array([11, 12, 13, 14, 15, 16])
+HIPS = np.array([23, 24])
+
+
+class Station:
+    """
+    One patient: their sliding window, exercise and latest prediction.
+
+    A station is fed either by its own camera or by one of several poses
+    detected in a shared camera's frames (see match_poses). Stations do not
+    run the classifier themselves; a SharedClassifier scores the windows of
+    every station that is due in one invoke.
+    """
+
+    def __init__(self, name, exercise=None, window_frames=10, inference_stride=10, threshold_matrix=None):
+        self.name = name
+        self.threshold_matrix = REGISTRY.threshold_matrix if threshold_matrix is None else threshold_matrix
+        self.inference_stride = inference_stride
+        self.keypoint_deque = deque(maxlen=window_frames)
+        self.visibility_deque = deque(maxlen=window_frames)
+        self.gate = InferenceGate()
+        self.frames_since_inference = 0
+        self.predicted_errors = None
+        self.probabilities = None
+        # Normalized hip midpoint of the tracked person, for matching poses to stations
+        self.center = None
+        self.set_exercise(exercise or REGISTRY.default)
+
+    def set_exercise(self, exercise):
+        self.exercise = exercise
+        self.exercise_index = REGISTRY.index[exercise]
+        self.encoding = REGISTRY.encoding_matrix[self.exercise_index]
+        self.thresholds = self.threshold_matrix[self.exercise_index]
+        self.reset()
+
+    def reset(self):
+        """Start again from an empty window, e.g. when the person is lost"""
+        self.keypoint_deque.clear()
+        self.visibility_deque.clear()
+        self.gate.reset()
+        self.frames_since_inference = 0
+        self.predicted_errors = None
+        self.probabilities = None
+
+    def push(self, landmark_array):
+        """Append one frame of a (33, 5) landmark array to the window"""
+        self.keypoint_deque.append(
+            np.concatenate((self.encoding, landmark_array[KEYPOINTS_OF_INTEREST, X:X + 3].reshape(-1)))
+        )
+        self.visibility_deque.append(
+            landmark_array[KEYPOINTS_OF_INTEREST, VISIBILITY:PRESENCE + 1].min(axis=1).mean()
+        )
+        self.center = landmark_array[HIPS, X:Y + 1].mean(axis=0)
+        self.frames_since_inference += 1
+
+    def lost(self):
+        """No pose was matched to this station in the latest frame"""
+        if self.center is not None:
+            self.center = None
+            self.reset()
+
+    def due(self):
+        """True if the window is full, the stride has passed and the gate lets it through"""
+        if len(self.keypoint_deque) < self.keypoint_deque.maxlen or self.frames_since_inference < self.inference_stride:
+            return False
+        self.frames_since_inference = 0
+        window = np.array(self.keypoint_deque, dtype=np.float32)
+        return self.gate.should_invoke(window[:, len(self.encoding):], np.array(self.visibility_deque))
+
+
+def match_poses(stations, landmark_arrays, max_distance=0.25):
+    """
+    Assigns the poses detected in one camera's frame to that camera's stations.
+    Poses go to the station whose last hip midpoint is nearest (within
+    max_distance, in normalized units); the rest go to free stations from left
+    to right. Stations left without a pose are marked lost. Returns the
+    (station, landmark_array) pairs that were assigned.
+    """
+    centers = [landmarks[HIPS, X:Y + 1].mean(axis=0) for landmarks in landmark_arrays]
+    unmatched = set(range(len(landmark_arrays)))
+    assigned = {}
+
+    tracked = [(np.linalg.norm(station.center - centers[p]), s, p)
+               for s, station in enumerate(stations) if station.center is not None
+               for p in unmatched]
+    for distance, s, p in sorted(tracked, key=lambda item: item[0]):
+        if distance <= max_distance and s not in assigned and p in unmatched:
+            assigned[s] = p
+            unmatched.discard(p)
+
+    free = [s for s in range(len(stations)) if s not in assigned]
+    for s, p in zip(free, sorted(unmatched, key=lambda p: centers[p][0])):
+        # Their person moved out of reach, so this may be someone else: start a fresh window
+        stations[s].lost()
+        assigned[s] = p
+
+    pairs = []
+    for s, station in enumerate(stations):
+        if s in assigned:
+            pairs.append((station, landmark_arrays[assigned[s]]))
+        else:
+            station.lost()
+    return pairs
+
+
+class SharedClassifier:
+    """
+    One classifier for every station in the process.
+
+    The engine is created once with batch_size=capacity. Each call to classify()
+    copies the windows of the stations that are due into one batch and runs a
+    single invoke, so the TFLite runtime, its threads and its weights are
+    shared, and the per-invoke overhead is paid once per batch, not once per
+    patient. Unused rows are left as they are and their outputs ignored.
+    """
+
+    def __init__(self, model_path, capacity, **engine_settings):
+        self.engine = InferenceEngine(model_path, batch_size=capacity, **engine_settings)
+        self.capacity = capacity
+        self._batch = np.zeros(self.engine.input_shape, dtype=np.float32)
+        self.invokes = 0
+        self.windows = 0
+        self.seconds = 0.0
+
+    def classify(self, stations):
+        """Scores every due station; returns the stations that got a new prediction"""
+        due = [station for station in stations if station.due()]
+        for start in range(0, len(due), self.capacity):
+            chunk = due[start:start + self.capacity]
+            begin = time.perf_counter()
+            for row, station in enumerate(chunk):
+                self._batch[row] = np.stack(station.keypoint_deque)
+            self.engine.write_batch(self._batch)
+            # Copied, so the output buffer is free for the next invoke
+            probabilities = np.array(self.engine.invoke()[:len(chunk)])
+            self.seconds += time.perf_counter() - begin
+            self.invokes += 1
+            self.windows += len(chunk)
+            for station, station_probabilities in zip(chunk, probabilities):
+                station.probabilities = station_probabilities
+                station.predicted_errors = (station_probabilities > station.thresholds).astype(int)
+        return due
+
+    def stats(self):
+        """Invoke counts and the average cost per invoke and per window, in milliseconds"""
+        return {
+            "invokes": self.invokes,
+            "windows": self.windows,
+            "ms_per_invoke": 1000.0 * self.seconds / self.invokes if self.invokes else 0.0,
+            "ms_per_window": 1000.0 * self.seconds / self.windows if self.windows else 0.0,
+        }
@@ -0,0 +1,79 @@
+import os
+
+# Environment variables each library reads when it is first imported.
+# The TFLite interpreter has none; it takes budget["tflite"] as num_threads.
+_ENV_VARS = {
+    "numba": "NUMBA_NUM_THREADS",
+}
+
+
+def plan_thread_budget(cpu_count=None, tflite=None, opencv=None, numba=None):
+    """
+    Decide how many threads each library may use, based on the core count.
+
+    MediaPipe's graph threads and QMediaPlayer's decoder cannot be capped from
+    Python, so cores are reserved for them (and for the UI and camera grabber
+    threads) before the remaining cores are shared out. The classifier input is
+    tiny (10 x 21), so extra TFLite threads mostly add synchronization cost;
+    OpenCV only converts, resizes and flips one frame at a time.
+    Explicit arguments override the computed values.
+    """
+    cores = cpu_count or os.cpu_count() or 1
+    reserved = {
+        "mediapipe": max(1, cores // 4),
+        "ui_and_video": 1,
+        "camera": 1,
+    }
+    available = max(1, cores - sum(reserved.values()))
+    budget = {
+        "cores": cores,
+        "reserved": reserved,
+        "tflite": min(2, available),
+        "opencv": 1 if available < 4 else 2,
+        # The Numba kernels run once per frame on 6 keypoints
+        "numba": 1,
+    }
+    if tflite is not None:
+        budget["tflite"] = tflite
+    if opencv is not None:
+        budget["opencv"] = opencv
+    if numba is not None:
+        budget["numba"] = numba
+    return budget
+
+
+def configure_environment(budget):
+    """
+    Export the thread counts for libraries that only read them at import time.
+    Must run before numba is imported to take full effect.
+    """
+    os.environ.setdefault(_ENV_VARS["numba"], str(budget["numba"]))
+
+
+def apply_thread_budget(budget):
+    """Apply the thread counts to libraries that can be changed at runtime"""
+    import cv2
+
+    cv2.setNumThreads(budget["opencv"])
+    try:
+        import numba
+
+        numba.set_num_threads(min(budget["numba"], numba.config.NUMBA_NUM_THREADS))
+    except ImportError:
+        pass
+
+
+def _budget_from_env():
+    # REVAITALIZE_THREADS="tflite=2,opencv=1,numba=1" overrides the computed values
+    overrides = {}
+    for item in os.environ.get("REVAITALIZE_THREADS", "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            if name.strip() in ("tflite", "opencv", "numba"):
+                overrides[name.strip()] = int(value)
+    return plan_thread_budget(**overrides)
+
+
+# Process-wide budget; the single place thread counts are decided
+BUDGET = _budget_from_env()
+configure_environment(BUDGET)
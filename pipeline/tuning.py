@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import hashlib
+import platform
+import threading
+
+import numpy as np
+
+from pipeline.inference import InferenceEngine
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", ".tflite_tuning.json")
+
+# Settings measured this process, so each model is only looked up once
+_memory_cache = {}
+# One calibration at a time: concurrent ones would skew each other's timings and race on the cache file
+_tuning_lock = threading.Lock()
+
+
+def model_hash(model_path):
+    """SHA-256 of the model file"""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cpu_model():
+    """Human-readable CPU model, used to key the cache per machine"""
+    if os.path.exists("/proc/cpuinfo"):
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    return platform.processor() or platform.machine()
+
+
+def _time_engine(engine, iterations, warmup=5):
+    window = np.random.default_rng(0).random(engine.input_shape[1:]).astype(np.float32)
+    engine.write_window(window)
+    for _ in range(warmup):
+        engine.interpreter.invoke()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        engine.interpreter.invoke()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000.0
+
+
+def calibrate(model_path, thread_values, iterations=50):
+    """Times the model for every thread count with and without the XNNPACK delegate"""
+    results = []
+    for xnnpack in (True, False):
+        for num_threads in thread_values:
+            try:
+                engine = InferenceEngine(model_path, num_threads=num_threads, xnnpack=xnnpack)
+            except (RuntimeError, ValueError) as e:
+                print(f"Skipping num_threads={num_threads} xnnpack={xnnpack}: {e}")
+                continue
+            latency_ms = _time_engine(engine, iterations)
+            print(f"num_threads={num_threads} xnnpack={xnnpack}: {latency_ms:.3f} ms")
+            results.append({"num_threads": num_threads, "xnnpack": xnnpack, "latency_ms": latency_ms})
+    return results
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def tuned_settings(model_path, max_threads=None, cache_path=CACHE_PATH):
+    """
+    Returns {"num_threads": n, "xnnpack": bool} for the fastest setting of this model
+    on this machine. Measured once per (model hash, CPU model) and cached in
+    cache_path; later launches reuse the cached result without re-measuring.
+    max_threads caps the thread counts tried (e.g. the TFLite thread budget).
+    Safe to call from several threads; callers wait for a calibration in progress.
+    """
+    with _tuning_lock:
+        return _tuned_settings(model_path, max_threads, cache_path)
+
+
+def _tuned_settings(model_path, max_threads, cache_path):
+    max_threads = max_threads or os.cpu_count() or 1
+    key = f"{model_hash(model_path)}|{cpu_model()}"
+    if key in _memory_cache:
+        return _memory_cache[key]
+
+    cache = _load_cache(cache_path)
+    entry = cache.get(key)
+    if entry is None or entry["max_threads"] != max_threads:
+        print(f"Calibrating {os.path.basename(model_path)} (up to {max_threads} threads)...")
+        thread_values = sorted({1, 2, 4, max_threads} & set(range(1, max_threads + 1)))
+        results = calibrate(model_path, thread_values)
+        if not results:
+            return {"num_threads": max_threads, "xnnpack": True}
+        best = min(results, key=lambda r: r["latency_ms"])
+        entry = {
+            "model": os.path.basename(model_path),
+            "max_threads": max_threads,
+            "num_threads": best["num_threads"],
+            "xnnpack": best["xnnpack"],
+            "latency_ms": best["latency_ms"],
+            "results": results,
+        }
+        cache[key] = entry
+        try:
+            with open(cache_path, "w") as f:
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            print(f"Could not write tuning cache {cache_path}: {e}")
+
+    settings = {"num_threads": entry["num_threads"], "xnnpack": entry["xnnpack"]}
+    _memory_cache[key] = settings
+    return settings
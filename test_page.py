@@ -1,6 +1,7 @@
+# Thread budget must be exported before numba is imported
+from pipeline.threads import BUDGET, apply_thread_budget
 import cv2
 import numpy as np
-import tensorflow as tf
 import mediapipe as mp
 from mediapipe import solutions
 from mediapipe.framework.formats import landmark_pb2
@@ -14,13 +15,14 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QWidget,
     QComboBox,
+    QCheckBox,
     QSizePolicy,
     QToolButton,
     QMenu,
 )
 from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtGui import QIcon, QImage, QPixmap, QAction
-from PyQt6.QtCore import QSize, Qt, QThread, QMutex, QTimer, QUrl
+from PyQt6.QtCore import QSize, Qt, QThread, QMutex, QWaitCondition, QTimer, QUrl
 from PyQt6.QtMultimedia import QMediaPlayer
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 import sys
@@ -30,6 +32,21 @@ from collections import deque
 import constants
 import font_utils
 import os
+from pipeline.camera import CameraGrabber
+from pipeline.cascade import CorrectnessCascade, cascade_path
+from pipeline.evaluation import load_thresholds, thresholds_path
+from pipeline.exercises import REGISTRY
+from pipeline.feedback import get_evaluation_from_binary
+from pipeline.gating import InferenceGate
+from pipeline.governor import LatencyGovernor
+from pipeline.inference import InferenceEngine
+from pipeline.landmarks import landmarks_to_array, VISIBILITY, PRESENCE
+from pipeline.pose import create_pose_landmarker, lighter_variants, pose_model_path, select_pose_variant
+from pipeline.recognition import ExerciseRecognizer
+from pipeline.renderer import SkeletonRenderer
+from pipeline.tuning import tuned_settings
+
+apply_thread_budget(BUDGET)
 
 # Numba-optimized functions
 @jit(nopython=True, parallel=True, fastmath=True)
@@ -52,54 +69,6 @@ def extract_keypoints_numba(landmarks_x, landmarks_y, landmarks_z, keypoints_ind
     return kp_np
 
 
-def get_evaluation_from_binary(binary_array, return_error_indices=False):
-    """
-    Returns a concise, grouped human-readable string for the flagged joints.
-    If return_error_indices=True, also returns a list of pose indices (11-16) that are erroneous.
-    """
-    joint_names = [
-        "Left Shoulder", "Right Shoulder", "Left Elbow", "Right Elbow", "Left Wrist", "Right Wrist"
-    ]
-    pose_indices = [11, 12, 13, 14, 15, 16]
-    arr = binary_array[0] if hasattr(binary_array, '__len__') and hasattr(binary_array[0], '__len__') else binary_array
-    if len(arr) != 6:
-        return ("Unknown error", []) if return_error_indices else "Unknown error"
-    # Indices for easier reference
-    ls, rs, le, re, lw, rw = arr
-    # All joints
-    if all(arr):
-        label = "Upper Extremity"
-    elif ls and rs and not (le or re or lw or rw):
-        label = "Spine"
-    elif le and re and not (ls or rs or lw or rw):
-        label = "Both Elbows"
-    elif lw and rw and not (ls or rs or le or re):
-        label = "Both Wrists"
-    elif le and lw and not (ls or rs or re or rw):
-        label = "Left Forearm"
-    elif re and rw and not (ls or rs or le or lw):
-        label = "Right Forearm"
-    elif ls and le and lw and not (rs or re or rw):
-        label = "Left Arm"
-    elif rs and re and rw and not (ls or le or lw):
-        label = "Right Arm"
-    elif ls and rs and (le or re or lw or rw) and not (not le and not re and not lw and not rw):
-        if le and re and lw and rw:
-            label = "Upper Extremity"
-        else:
-            label = "Spine"
-    else:
-        error_labels = [name for bit, name in zip(arr, joint_names) if bit]
-        if not error_labels:
-            label = "Correct"
-        else:
-            label = ", ".join(error_labels)
-    error_indices = [pose_indices[i] for i, bit in enumerate(arr) if bit]
-    if return_error_indices:
-        return label, error_indices
-    return label
-
-
 def draw_custom_landmarks(image, landmarks, error_indices=None):
     """
     Draw only landmarks from 11-24 with color coding:
@@ -110,63 +79,16 @@ def draw_custom_landmarks(image, landmarks, error_indices=None):
     landmarks: Can be either MediaPipe Pose Solution landmarks (has .landmark attribute) 
               or MediaPipe Tasks landmarks (direct list of landmarks)
     
-    Note: Image should already be flipped for correct display
+    Note: Image should already be flipped for correct display.
+    Returns a copy; the video thread uses SkeletonRenderer.draw to draw in place.
     """
     if not isinstance(error_indices, (list, tuple, set)):
         error_indices = []
-    # Define keypoint indices for upper body (11-24)
-    upper_body_indices = list(range(11, 25))
-    # BGR format colors for OpenCV
-    RED = (182, 0, 18)
-    GREEN = (101, 184, 101)
-    height, width, _ = image.shape
-    
-    # Make a copy of the image to draw on
     output_image = image.copy()
-    
-    # Check if landmarks is from old API (has .landmark attribute) or new Tasks API (direct list)
-    if hasattr(landmarks, 'landmark'):
-        landmark_list = landmarks.landmark
-    else:
-        landmark_list = landmarks  # It's already a list in the Tasks API
-
-    # Draw keypoints
-    for idx in upper_body_indices:
-        if idx < len(landmark_list):
-            landmark = landmark_list[idx]
-            # Convert normalized coordinates to pixel values
-            # Flip X coordinate since the image is already flipped
-            landmark_px = (int((1-landmark.x) * width), int(landmark.y * height))
-            # Use BGR color format (OpenCV default)
-            color = RED if idx in error_indices else GREEN
-            cv2.circle(output_image, landmark_px, 7, color, -1)  # Make points slightly bigger
-
-    # Define connections for upper body
-    upper_body_connections = [
-        (11, 12),  # Shoulders
-        (11, 13),
-        (13, 15),  # Left arm
-        (12, 14),
-        (14, 16),  # Right arm
-        (11, 23),
-        (12, 24),  # Hip connections
-        (23, 24),  # Hip line
-    ]
-
-    # Draw connections
-    for connection in upper_body_connections:
-        start_idx, end_idx = connection
-        if start_idx < len(landmark_list) and end_idx < len(landmark_list):
-            start = landmark_list[start_idx]
-            end = landmark_list[end_idx]
-            # Flip X coordinates since the image is already flipped
-            start_point = (int((1-start.x) * width), int(start.y * height))
-            end_point = (int((1-end.x) * width), int(end.y * height))
-            color = RED if (start_idx in error_indices or end_idx in error_indices) else GREEN
-            cv2.line(output_image, start_point, end_point, color, 4)
-
-    return output_image  # No need to flip again, already flipped
+    return _default_renderer.draw(output_image, landmarks_to_array(landmarks), error_indices)
+
 
+_default_renderer = SkeletonRenderer()
 
 
 class VideoThread(QThread):
@@ -174,67 +96,86 @@ class VideoThread(QThread):
     fps_update = pyqtSignal(float)
     prediction_signal = pyqtSignal(str)
     enough_frames_signal = pyqtSignal()
+    governor_update = pyqtSignal(dict)
+    exercise_recognized = pyqtSignal(str)
+    model_swapped = pyqtSignal(str)
 
     def __init__(self, model_path):
         super().__init__()
-        # Load TensorFlow Lite model
-        self.interpreter = tf.lite.Interpreter(model_path=model_path)
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
+        # The TensorFlow Lite model is loaded by _load_models on this thread once it runs,
+        # so a first-launch calibration overlaps the countdown instead of blocking the UI
+        self.model_path = model_path
+        self.engine = None
+        self.engine_settings = None
 
         # MediaPipe Tasks setup for BlazePose
-        self.blazepose_model_path = "./models/pose_landmarker_full.task"
-        self.camera_index = 0
+        self.camera_index = constants.CAMERA_INDEX
         self.latest_pose_result = None
+
+        # Capture format, applied when the camera is opened
+        self.capture_width = constants.CAMERA_WIDTH
+        self.capture_height = constants.CAMERA_HEIGHT
+        self.capture_fourcc = constants.CAMERA_FOURCC
+        self.capture_buffer_size = constants.CAMERA_BUFFER_SIZE
+        self.capture_fps = constants.CAMERA_FPS
+        self.grabber = None
+        self.capture_latency_ms = 0.0
         
+        self.target_fps = 15  # Target frames per second
+        self.min_frame_time = 1.0 / self.target_fps  # Minimum time between frames
+
+        # The pose model (lite/full/heavy) is chosen and loaded by _load_models
+        self.pose_variant = None
+        self.blazepose_model_path = None
+        self.pose_landmarker = None
+
         # Initialize MediaPipe Tasks API
-        self.BaseOptions = mp.tasks.BaseOptions
-        self.PoseLandmarker = mp.tasks.vision.PoseLandmarker
-        self.PoseLandmarkerOptions = mp.tasks.vision.PoseLandmarkerOptions
-        self.VisionRunningMode = mp.tasks.vision.RunningMode
-        
+        # The .task file is read once per process and shared by every landmarker.
         # Skip the streaming mode and use the image mode instead to avoid async issues
-        self.pose_landmarker = self.PoseLandmarker.create_from_options(
-            self.PoseLandmarkerOptions(
-                base_options=self.BaseOptions(model_asset_path=self.blazepose_model_path),
-                running_mode=self.VisionRunningMode.IMAGE,  # Use IMAGE mode instead of LIVE_STREAM
-                min_pose_detection_confidence=0.90,
-                min_pose_presence_confidence=0.75,
-                min_tracking_confidence=0.90,
-                output_segmentation_masks=False,
-                num_poses=1  # We only need one pose for our application
-            )
+        self.pose_options = dict(
+            min_pose_detection_confidence=0.90,
+            min_pose_presence_confidence=0.75,
+            min_tracking_confidence=0.90,
+            output_segmentation_masks=False,
+            num_poses=1  # We only need one pose for our application
         )
 
         self.SLIDING_AMOUNT = 10
         self.WINDOW_FRAME_AMOUNT = 10
-        self.exercise_thresholds = {
-            "Hiding Face": np.array([0.4, 0.45, 0.6, 0.6, 0.65, 0.55]),
-            "Torso Rotation": np.array([0.75, 0.65, 0.75, 0.7, 0.75, 0.7]),
-            "Flank Stretch": np.array([0.75, 0.7, 0.7, 0.8, 0.7, 0.8]),
-        }
-        self.current_exercise = "Hiding Face"  # Set default here
-        # Add one-hot encoding mapping for exercises
-        self.exercise_encoding = {
-            "Flank Stretch": np.array([1.0, 0.0, 0.0], dtype=np.float32),
-            "Hiding Face": np.array([0.0, 1.0, 0.0], dtype=np.float32),
-            "Torso Rotation": np.array([0.0, 0.0, 1.0], dtype=np.float32),
-        }
-        self.exercise_encoding_data = self.exercise_encoding[self.current_exercise]
-        self.BEST_THRESHOLDS = self.exercise_thresholds[self.current_exercise]
+        # Per-exercise one-hot encodings and thresholds come from the exercise registry;
+        # thresholds calibrated for this model (utils/calibrate_thresholds.py) override the defaults
+        calibrated = load_thresholds(thresholds_path(model_path))
+        if calibrated:
+            print(f"Loaded calibrated thresholds for {', '.join(calibrated)}")
+        self.threshold_matrix = REGISTRY.thresholds_with(calibrated)
+        self.current_exercise = REGISTRY.default
+        self.exercise_index = REGISTRY.index[self.current_exercise]
+        self.exercise_encoding_data = REGISTRY.encoding_matrix[self.exercise_index]
+        self.BEST_THRESHOLDS = self.threshold_matrix[self.exercise_index]
         self.running = False
         self.keypoint_data = []
         self.predicted_class = "Waiting"
         self.keypoints_of_interest = np.array([11, 12, 13, 14, 15, 16])
-        self.target_fps = 15  # Target frames per second
-        self.min_frame_time = 1.0 / self.target_fps  # Minimum time between frames
         self.last_frame_timestamp = 0
 
         # Use deque for efficient sliding window implementation
         self.keypoint_deque = deque(
             maxlen=self.WINDOW_FRAME_AMOUNT
         )  # additional 3 data points for encoded exercise information
+        # Per-frame visibility of the tracked joints, aligned with keypoint_deque
+        self.visibility_deque = deque(maxlen=self.WINDOW_FRAME_AMOUNT)
+
+        # Skips invokes on poorly visible or motionless windows and reuses the last prediction
+        self.gate = InferenceGate()
+
+        # Automatic exercise recognition; scores every exercise in one batched invoke when enabled
+        self.recognizer = None
+        self.auto_exercise = False
+
+        # Optional stage-1 model (utils/fit_cascade.py) that answers confident "Correct" windows itself
+        cascade_file = cascade_path(model_path)
+        self.cascade = CorrectnessCascade.load(cascade_file) if os.path.exists(cascade_file) else None
+        self.cascade_enabled = self.cascade is not None
 
         # Performance monitoring
         self.frame_times = deque(maxlen=30)  # Use deque with fixed size
@@ -248,14 +189,34 @@ class VideoThread(QThread):
 
         # Inference control
         self.frames_since_inference = 0
+        self.inference_stride = 10  # Frames between inferences once the window is full
         self._enough_frames_emitted = False
 
-        # Pre-allocate memory for inference
-        # Update shape to accommodate exercise encoding (3) + keypoints (18) = 21
-        self.model_input = np.zeros(
-            (1, self.WINDOW_FRAME_AMOUNT, 21),
-            dtype=np.float32,
+        # Adaptive frame-rate governor: trades capture rate, pose resolution and model,
+        # and inference stride to hold the end-to-end latency target
+        self.adaptive = True
+        self.governor = LatencyGovernor(
+            fps=self.target_fps,
+            stride_bounds=(self.inference_stride, 20),
         )
+        self.pose_scale = 1.0
+        self.pose_frame = None
+        self.pose_latency_ms = 0.0
+        self.inference_latency_ms = 0.0
+
+        # Skeleton renderer; set display_size to draw on a downscaled display buffer
+        self.renderer = SkeletonRenderer()
+        self.frame_rgb = None
+
+        # Warm-up and start gating: arm() starts the thread early, begin() lets frames through
+        self.begun = True
+        self.begin_mutex = QMutex()
+        self.begin_condition = QWaitCondition()
+        # Start-up latency, measured from the start click
+        self.start_requested_at = None
+        self.warm_up_ms = None
+        self.first_frame_ms = None
+        self.first_prediction_ms = None
 
     # Set the current exercise and update relevant settings
     def set_current_exercise(self, exercise_name):
@@ -270,14 +231,17 @@ class VideoThread(QThread):
                     return False
             
             # Safe to change exercise
-            if exercise_name in self.exercise_encoding and exercise_name in self.exercise_thresholds:
+            if exercise_name in REGISTRY:
                 self.current_exercise = exercise_name
-                self.exercise_encoding_data = self.exercise_encoding[exercise_name]
-                self.BEST_THRESHOLDS = self.exercise_thresholds[exercise_name]
+                self.exercise_index = REGISTRY.index[exercise_name]
+                self.exercise_encoding_data = REGISTRY.encoding_matrix[self.exercise_index]
+                self.BEST_THRESHOLDS = self.threshold_matrix[self.exercise_index]
                 print(f"Exercise changed to: {exercise_name}")
                 
                 # Clear the keypoint deque to start fresh with the new exercise
                 self.keypoint_deque.clear()
+                self.visibility_deque.clear()
+                self.gate.reset()
                 self.frames_since_inference = 0
                 self.predicted_class = "Waiting"
                 self.mutex.unlock()
@@ -292,6 +256,200 @@ class VideoThread(QThread):
             self.mutex.unlock()
             return False
 
+    # Start warming up and opening the camera ahead of begin()
+    def arm(self, start_requested_at=None):
+        """Start the thread now so warm-up and camera start overlap the countdown; frames flow after begin()"""
+        self.start_requested_at = start_requested_at or time.perf_counter()
+        self.begun = False
+        self.start()
+
+    def begin(self, start_requested_at=None):
+        """Let an armed or paused thread process frames; start_requested_at restarts the latency measurement"""
+        if start_requested_at is not None:
+            self.start_requested_at = start_requested_at
+            self.first_frame_ms = None
+            self.first_prediction_ms = None
+        self.begin_mutex.lock()
+        self.begun = True
+        self.begin_condition.wakeAll()
+        self.begin_mutex.unlock()
+
+    def pause(self):
+        """Stop classifying and emitting frames until begin(), keeping the camera and landmarker open"""
+        self.begin_mutex.lock()
+        self.begun = False
+        self.begin_mutex.unlock()
+
+    def _wait_for_begin(self):
+        # Blocks until begin() or stop(); returns False if the thread was stopped
+        self.begin_mutex.lock()
+        while not self.begun and self.running:
+            self.begin_condition.wait(self.begin_mutex, 100)
+        self.begin_mutex.unlock()
+        if not self.running:
+            return False
+
+        # Each rep starts from an empty window and a fresh frame
+        self.mutex.lock()
+        self.keypoint_deque.clear()
+        self.visibility_deque.clear()
+        self.predicted_class = "Waiting"
+        self.mutex.unlock()
+        self.gate.reset()
+        if self.recognizer is not None:
+            self.recognizer.reset()
+        self.frames_since_inference = 0
+        self._enough_frames_emitted = False
+        self.frame_times.clear()
+        self.last_frame_timestamp = time.time()
+        self.last_frame_time = self.last_frame_timestamp
+        # Drop the frame that waited out the pause
+        self.grabber.read(timeout_ms=100)
+        return True
+
+    def _load_models(self):
+        """Load the pose model and classifier on the video thread, before warm-up"""
+        # The most accurate of the lite/full/heavy models that fits the frame budget,
+        # benchmarked on the first launch on this machine
+        self.pose_variant, pose_latencies = select_pose_variant(self.target_fps, self.capture_width, self.capture_height)
+        self.blazepose_model_path = pose_model_path(self.pose_variant)
+        if pose_latencies:
+            print(f"Pose model: {self.pose_variant} (" + ", ".join(
+                f"{variant} {ms:.1f} ms" for variant, ms in pose_latencies.items()
+            ) + f"; budget {1000.0 / self.target_fps:.1f} ms per frame)")
+        self.pose_landmarker = create_pose_landmarker(self.blazepose_model_path, **self.pose_options)
+        self.governor.pose_model = self.pose_variant
+        self.governor.lighter_pose_models = lighter_variants(self.pose_variant)
+
+        model_path = self.model_path
+        # Windows are written straight into the interpreter's input buffer
+        # Thread count and XNNPACK use are calibrated once per model and machine
+        settings = tuned_settings(model_path, max_threads=BUDGET["tflite"])
+        engine = InferenceEngine(model_path, **settings)
+
+        self.mutex.lock()
+        self.engine = engine
+        self.engine_settings = settings
+        # set_model may have been called while the calibration ran
+        requested = self.model_path
+        self.model_path = model_path
+        if self.auto_exercise and self.recognizer is None:
+            self.recognizer = self._create_recognizer()
+        self.mutex.unlock()
+        if requested != model_path:
+            self.set_model(requested)
+
+    def warm_up(self, passes=3):
+        """
+        Run the pose model, classifier, keypoint kernel and renderer on dummy inputs,
+        so lazy allocation, graph setup and JIT compilation are not paid on the first rep.
+        """
+        start = time.perf_counter()
+        blank = np.zeros((self.capture_height, self.capture_width, 3), dtype=np.uint8)
+        window = np.zeros(self.engine.input_shape[1:], dtype=np.float32)
+        for _ in range(passes):
+            self.pose_landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=blank))
+            self.engine.write_window(window)
+            self.engine.invoke()
+            if self.recognizer is not None:
+                self.recognizer.score(window)
+        landmark_array = np.zeros((33, 5), dtype=np.float32)
+        extract_keypoints_numba(
+            landmark_array[:, 0], landmark_array[:, 1], landmark_array[:, 2], self.keypoints_of_interest
+        )
+        self.renderer.draw(self.renderer.mirror(blank), landmark_array)
+        self.warm_up_ms = 1000.0 * (time.perf_counter() - start)
+        print(f"Warm-up took {self.warm_up_ms:.0f} ms")
+
+    def _since_start_ms(self):
+        return 1000.0 * (time.perf_counter() - self.start_requested_at)
+
+    # Switch classifier models without stopping the video pipeline
+    def set_model(self, model_path):
+        """Load model_path in the background; it replaces the current model between windows"""
+        self.mutex.lock()
+        if self.engine is None:
+            # Not loaded yet; _load_models picks the new path up
+            self.model_path = model_path
+            self.mutex.unlock()
+            return
+        self.mutex.unlock()
+        if model_path == self.model_path and not self.engine.loading:
+            return
+        print(f"Loading {model_path} in the background...")
+        tune = lambda path: tuned_settings(path, max_threads=BUDGET["tflite"])
+        self.engine.load_async(model_path, tune=tune)
+        recognizer = self.recognizer
+        if recognizer is not None:
+            recognizer.engine.load_async(model_path, tune=tune)
+
+    def _swap_model(self):
+        # Runs on the video thread between windows, so no invoke is in flight
+        swap_start = time.perf_counter()
+        self.engine.apply_pending()
+        self.model_path = self.engine.model_path
+        self.engine_settings = {"num_threads": self.engine.num_threads, "xnnpack": self.engine.xnnpack}
+
+        # Thresholds and the stage-1 model are fitted per classifier
+        threshold_matrix = REGISTRY.thresholds_with(load_thresholds(thresholds_path(self.model_path)))
+        cascade_file = cascade_path(self.model_path)
+        self.cascade = CorrectnessCascade.load(cascade_file) if os.path.exists(cascade_file) else None
+        self.mutex.lock()
+        self.threshold_matrix = threshold_matrix
+        self.BEST_THRESHOLDS = threshold_matrix[self.exercise_index]
+        self.cascade_enabled = self.cascade is not None
+        recognizer = self.recognizer
+        if recognizer is not None:
+            recognizer.threshold_matrix = threshold_matrix
+            recognizer.reset()
+            if recognizer.engine.pending_model_path() != self.model_path:
+                recognizer.engine.discard_pending()
+            if not recognizer.engine.apply_pending() and recognizer.engine.model_path != self.model_path:
+                # Auto mode was turned on after the load started
+                recognizer.engine.load_async(self.model_path)
+        self.mutex.unlock()
+        self.gate.reset()
+
+        swap_ms = 1000.0 * (time.perf_counter() - swap_start)
+        print(f"Model swap to {os.path.basename(self.model_path)} took {swap_ms:.2f} ms on the video thread")
+        self.model_swapped.emit(self.model_path)
+
+    # Enable or disable the stage-1 pre-classifier
+    def set_cascade_enabled(self, enabled):
+        """Use the stage-1 model, if one was fitted for this classifier"""
+        self.cascade_enabled = enabled and self.cascade is not None
+
+    # Enable or disable automatic exercise recognition
+    def set_auto_exercise(self, enabled):
+        """Infer the exercise from the landmarks instead of using the selected one"""
+        self.mutex.lock()
+        try:
+            self.auto_exercise = enabled
+            # Before the classifier is loaded, _load_models creates the recognizer
+            if enabled and self.recognizer is None and self.engine is not None:
+                self.recognizer = self._create_recognizer()
+            elif not enabled:
+                self.recognizer = None
+        finally:
+            self.mutex.unlock()
+
+    def _create_recognizer(self):
+        # A second interpreter sized for one window per exercise
+        batch_engine = InferenceEngine(self.model_path, batch_size=len(REGISTRY), **self.engine_settings)
+        return ExerciseRecognizer(batch_engine, REGISTRY.encoding_matrix, self.threshold_matrix)
+
+    def _set_recognized_exercise(self, exercise_index):
+        # Unlike set_current_exercise, the window is kept: its frames are re-encoded per invoke
+        name = REGISTRY.names[exercise_index]
+        self.mutex.lock()
+        self.current_exercise = name
+        self.exercise_index = exercise_index
+        self.exercise_encoding_data = REGISTRY.encoding_matrix[exercise_index]
+        self.BEST_THRESHOLDS = self.threshold_matrix[exercise_index]
+        self.mutex.unlock()
+        print(f"Exercise recognized: {name}")
+        self.exercise_recognized.emit(name)
+
     # Set how many frames to discard/add when sliding the window
     def set_sliding_amount(self, amount):
         """Set how many frames to discard/add when sliding the window"""
@@ -308,16 +466,81 @@ class VideoThread(QThread):
         if fps > 0:
             self.target_fps = fps
             self.min_frame_time = 1.0 / fps
+            self.governor.preferred_fps = fps
+            self.governor.target_fps = fps
         else:
             print("Invalid FPS value. Must be greater than 0.")
 
+    # Enable or disable the adaptive frame-rate governor
+    def set_adaptive(self, enabled):
+        """Enable or disable latency-driven adjustment of fps, pose resolution and stride"""
+        self.adaptive = enabled
+        if not enabled:
+            # Undo whatever the governor degraded
+            self.governor.reset()
+            self.target_fps = self.governor.target_fps
+            self.min_frame_time = 1.0 / self.target_fps
+            self.pose_scale = self.governor.pose_scale
+            self.inference_stride = self.governor.inference_stride
+
+    def _apply_governor(self, decision):
+        # Apply the governor's settings; the thread only reads them between frames
+        self.target_fps = decision["target_fps"]
+        self.min_frame_time = 1.0 / self.target_fps
+        self.pose_scale = decision["pose_scale"]
+        self.inference_stride = decision["inference_stride"]
+        if decision["pose_model"] != self.pose_variant:
+            self._switch_pose_model(decision["pose_model"])
+        print(
+            f"Governor: {decision['action']} (latency {decision['latency_ms']} ms, "
+            f"cpu {decision['cpu_load']:.0%}) -> {self.target_fps} fps, "
+            f"pose scale {self.pose_scale}, stride {self.inference_stride}"
+        )
+        self.governor_update.emit(decision)
+
+    def _switch_pose_model(self, variant):
+        # Called between frames on the video thread, so detect() never sees a closed landmarker
+        start = time.perf_counter()
+        landmarker = create_pose_landmarker(pose_model_path(variant), **self.pose_options)
+        self.pose_landmarker.close()
+        self.pose_landmarker = landmarker
+        print(f"Pose model {self.pose_variant} -> {variant} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        self.pose_variant = variant
+        self.blazepose_model_path = pose_model_path(variant)
+
+    # Set the camera capture format
+    def set_capture_settings(self, width=None, height=None, fourcc=None, buffer_size=None, fps=None):
+        """Set the capture resolution, fourcc ("MJPG"/"YUYV"), driver buffer size and fps.
+        Takes effect the next time the camera is opened."""
+        if width is not None and height is not None:
+            self.capture_width = width
+            self.capture_height = height
+        if fourcc is not None:
+            self.capture_fourcc = fourcc
+        if buffer_size is not None:
+            self.capture_buffer_size = buffer_size
+        if fps is not None:
+            self.capture_fps = fps
+
+    # Set the size of the buffer the skeleton is drawn on
+    def set_display_size(self, display_size):
+        """Set the (width, height) of the display buffer, or None for full resolution"""
+        self.renderer = SkeletonRenderer(display_size=display_size)
+
     # We're not using the callback approach anymore since we're using IMAGE mode
 
     def run(self):
         self.running = True
-        cap = cv2.VideoCapture(0)
+        self.grabber = CameraGrabber(
+            camera_index=self.camera_index,
+            width=self.capture_width,
+            height=self.capture_height,
+            fourcc=self.capture_fourcc,
+            buffer_size=self.capture_buffer_size,
+            fps=self.capture_fps,
+        )
 
-        if not cap.isOpened():
+        if not self.grabber.open():
             print("Error: Could not open camera")
             self.running = False
             # Emit a blank frame or error message if needed
@@ -333,12 +556,27 @@ class VideoThread(QThread):
             )
             self.frame_update.emit(error_frame, "Error")
             return
+
+        # Frames are grabbed continuously on their own thread; we only take the newest
+        self.grabber.start()
+
+        # Load and warm up while the countdown runs; the loop then waits for begin() (no wait if not armed)
+        self._load_models()
+        self.warm_up()
         
         self.last_frame_timestamp = time.time()
         self.last_frame_time = time.time()
         self.frames_since_inference = 0
+        error_indices = []
 
         while self.running:
+            if not self.begun:
+                # Armed or paused between reps: the camera and landmarker stay open and warm
+                if not self._wait_for_begin():
+                    break
+                error_indices = []
+                continue
+
             if not self._enough_frames_emitted and self.frames_since_inference >= 10:
                 self._enough_frames_emitted = True
                 self.enough_frames_signal.emit()
@@ -355,29 +593,45 @@ class VideoThread(QThread):
 
             self.last_frame_timestamp = current_time
 
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: Failed to capture frame.")
-                # Optionally attempt to reopen the camera or break
-                time.sleep(0.5)
-                # Try reopening
-                cap.release()
-                cap = cv2.VideoCapture(self.camera_index)
-                if not cap.isOpened():
-                    print(f"Error: Could not reopen camera {self.camera_index}.")
-                    break  # Exit loop if reopen fails
-                continue  # Skip the rest of the loop iteration
+            # Swap in a model loaded by set_model once it (and the auto-detect batch model) is warm
+            recognizer = self.recognizer
+            if self.engine.has_pending() and (recognizer is None or not recognizer.engine.loading
+                                              or recognizer.engine.has_pending()):
+                self._swap_model()
+            elif recognizer is not None and recognizer.engine.has_pending() and not self.engine.loading:
+                # The main load finished first (or failed); only keep a batch model that matches it
+                if recognizer.engine.pending_model_path() == self.model_path:
+                    recognizer.engine.apply_pending()
+                else:
+                    recognizer.engine.discard_pending()
+
+            frame, capture_time = self.grabber.read()
+            if frame is None:
+                if not self.grabber.isRunning():
+                    # The grabber failed to reopen the camera
+                    break
+                continue  # No new frame yet, skip the rest of the loop iteration
 
             self.current_frame_count += 1
 
             # Process frame - keep original BGR frame for drawing
             # MediaPipe expects RGB input
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            self.frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.frame_rgb)
+            frame_rgb = self.frame_rgb
             
             # Use MediaPipe Tasks API for pose detection
-            frame_timestamp_ms = int(cap.get(cv2.CAP_PROP_POS_MSEC))
+            # Landmarks are normalized, so pose can run on a downscaled copy
+            pose_start = time.perf_counter()
+            pose_input = frame_rgb
+            if self.pose_scale < 1.0:
+                height, width = frame_rgb.shape[:2]
+                pose_size = (int(width * self.pose_scale), int(height * self.pose_scale))
+                self.pose_frame = cv2.resize(
+                    frame_rgb, pose_size, dst=self.pose_frame, interpolation=cv2.INTER_AREA
+                )
+                pose_input = self.pose_frame
             # Create MediaPipe Image from RGB frame
-            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=pose_input)
             
             # Use synchronous detection instead of async with proper error handling
             try:
@@ -390,66 +644,90 @@ class VideoThread(QThread):
                     break
                 # For other errors, set result to None and continue
                 result = None
+            pose_ms = 1000.0 * (time.perf_counter() - pose_start)
+            inference_ms = 0.0
             
             # Prepare data for display and potential inference
             self.mutex.lock()
             current_pred = self.predicted_class
-            current_exercise = self.current_exercise
+            exercise_index = self.exercise_index
             self.mutex.unlock()
 
-            # Compute error_indices for coloring
-            error_indices = []
-            if 'yhat_binary' in locals():
-                _, error_indices = get_evaluation_from_binary(yhat_binary, return_error_indices=True)
-
             # Always flip the frame for consistent display
-            frame = cv2.flip(frame_rgb, 1)  # Mirror horizontally for natural viewing
+            # Mirror horizontally into the renderer's display buffer
+            frame = self.renderer.mirror(frame_rgb)
             
             if result and result.pose_landmarks and len(result.pose_landmarks) > 0:
-                # Draw landmarks on the flipped RGB frame
-                frame = draw_custom_landmarks(
-                    frame, result.pose_landmarks[0], error_indices=error_indices
-                )
+                # Extract landmarks from the first detected pose in one pass
+                landmark_array = landmarks_to_array(result.pose_landmarks[0])
+
+                # Draw landmarks in place on the flipped RGB frame
+                # error_indices come from the latest prediction
+                self.renderer.draw(frame, landmark_array, error_indices)
 
-                # Extract landmarks from the first detected pose
-                landmarks = result.pose_landmarks[0]
                 # Extract keypoints using the modified extract_keypoints_numba function
                 kp_np = extract_keypoints_numba(
-                    np.array([landmark.x for landmark in landmarks], dtype=np.float32),
-                    np.array([landmark.y for landmark in landmarks], dtype=np.float32),
-                    np.array([landmark.z for landmark in landmarks], dtype=np.float32),
+                    landmark_array[:, 0],
+                    landmark_array[:, 1],
+                    landmark_array[:, 2],
                     self.keypoints_of_interest,
                 )
                 
                 # Get the one-hot encoding for the current exercise
-                exercise_vec = self.exercise_encoding[current_exercise]
+                exercise_vec = REGISTRY.encoding_matrix[exercise_index]
 
                 # Concatenate exercise encoding and keypoints
                 frame_features = np.concatenate((exercise_vec, kp_np))
 
                 # Append the combined features to the deque
                 self.keypoint_deque.append(frame_features)
+                self.visibility_deque.append(
+                    landmark_array[self.keypoints_of_interest, VISIBILITY:PRESENCE + 1].min(axis=1).mean()
+                )
 
                 # Only run inference if deque is full
                 if (
                     len(self.keypoint_deque) == self.WINDOW_FRAME_AMOUNT
-                    and self.frames_since_inference == 10
+                    and self.frames_since_inference >= self.inference_stride
                 ):
+                    inference_start = time.perf_counter()
                     self.frames_since_inference = 0
-                    self.model_input[0] = np.array(self.keypoint_deque)
-
-                    # Perform inference
-                    input_data = self.model_input.astype(self.input_details[0]['dtype'])
-                    self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-                    self.interpreter.invoke()
-                    yhat_prob = self.interpreter.get_tensor(self.output_details[0]['index'])
-                    yhat_binary = (yhat_prob > self.BEST_THRESHOLDS).astype(int)
-                    new_pred = get_evaluation_from_binary(yhat_binary)
-
-                    # Update shared state safely
-                    self.mutex.lock()
-                    self.predicted_class = new_pred
-                    self.mutex.unlock()
+                    # Assemble the window directly in the interpreter's input buffer
+                    # exercise encoding (3) + keypoints (18) = 21 features per frame
+                    self.engine.write_window(self.keypoint_deque)
+
+                    # Reuse the last prediction if the window is not worth classifying
+                    if self.gate.should_invoke(
+                        self.engine.input_window()[:, 3:], np.array(self.visibility_deque)
+                    ):
+                        recognizer = self.recognizer
+                        if recognizer is not None:
+                            # Score every exercise in one invoke and keep the most consistent one
+                            recognized, probabilities = recognizer.recognize(self.keypoint_deque)
+                            if recognized != self.exercise_index:
+                                self._set_recognized_exercise(recognized)
+                            yhat_binary = (probabilities > self.BEST_THRESHOLDS).astype(int)
+                        elif self.cascade_enabled and self.cascade.is_confidently_correct(self.engine.input_window()):
+                            # Stage 1 is confident the window is correct; the full model is skipped
+                            yhat_binary = np.zeros(len(REGISTRY.joints), dtype=int)
+                        else:
+                            model_start = time.perf_counter()
+                            # Perform inference; the output view must not outlive this line
+                            yhat_binary = (self.engine.invoke() > self.BEST_THRESHOLDS).astype(int)
+                            if self.cascade_enabled:
+                                self.cascade.record_model_time(time.perf_counter() - model_start)
+                        new_pred, error_indices = get_evaluation_from_binary(
+                            yhat_binary, return_error_indices=True
+                        )
+
+                        # Update shared state safely
+                        self.mutex.lock()
+                        self.predicted_class = new_pred
+                        self.mutex.unlock()
+                        if self.first_prediction_ms is None and self.start_requested_at is not None:
+                            self.first_prediction_ms = self._since_start_ms()
+                            print(f"First prediction {self.first_prediction_ms:.0f} ms after start")
+                    inference_ms = 1000.0 * (time.perf_counter() - inference_start)
                 else:
                     self.frames_since_inference += 1
 
@@ -458,6 +736,10 @@ class VideoThread(QThread):
                 self.mutex.lock()
                 self.predicted_class = "No Person"
                 self.mutex.unlock()
+                # The last prediction no longer applies once the person is lost
+                self.gate.reset()
+                if self.recognizer is not None:
+                    self.recognizer.reset()
 
             # Update FPS
             frame_time = current_time - self.last_frame_time
@@ -471,11 +753,29 @@ class VideoThread(QThread):
             self.mutex.lock()
             class_to_emit = self.predicted_class
             self.mutex.unlock()
+            latency_ms = 1000.0 * self.grabber.record_latency(capture_time)
+            self.capture_latency_ms = self.grabber.average_latency_ms()
+            self.pose_latency_ms = pose_ms
+            if inference_ms:
+                self.inference_latency_ms = inference_ms
             self.frame_update.emit(frame, class_to_emit)
+            if self.first_frame_ms is None and self.start_requested_at is not None:
+                self.first_frame_ms = self._since_start_ms()
+                print(f"First frame {self.first_frame_ms:.0f} ms after start")
+
+            # Let the governor adjust settings from the measured stage latencies
+            if self.adaptive:
+                self.governor.record(pose_ms, inference_ms, latency_ms)
+                decision = self.governor.update()
+                if decision:
+                    self._apply_governor(decision)
 
         # Release camera resources
-        if cap.isOpened():
-            cap.release()
+        self.grabber.stop()
+
+        print(f"Inference gate: {self.gate.stats()}")
+        if self.cascade is not None:
+            print(f"Cascade: {self.cascade.stats()}")
             
         # Clean up pose landmarker resources
         if self.pose_landmarker:
@@ -527,8 +827,8 @@ class VideoThread(QThread):
         self.wait()
         
         # Release camera resources if they exist
-        if hasattr(self, "capture") and self.capture.isOpened():
-            self.capture.release()
+        if self.grabber is not None and self.grabber.isRunning():
+            self.grabber.stop()
 
 
 
@@ -549,11 +849,9 @@ class MainWindow(QMainWindow):
         self.session_manager = session_manager
         self.thread = None
         self.exercise_selector = QComboBox()
-        self.exercise_selector.addItems(
-            ["Hiding Face", "Torso Rotation", "Flank Stretch"]
-        )
+        self.exercise_selector.addItems(REGISTRY.names)
         self.exercise_selector.currentTextChanged.connect(self.change_exercise)
-        self.guide_video_path = os.path.join("videos", "hiding_face.mp4")
+        self.guide_video_path = REGISTRY[REGISTRY.default]["guide_video"]
        
         # Repetition tracking
         if self.session_manager and self.session_manager.is_logged_in():
@@ -566,7 +864,8 @@ class MainWindow(QMainWindow):
         self.current_prediction = ""  # Store current prediction separately from label
         
         # Exercise tracking
-        self.current_exercise = "Hiding Face"  # Default exercise
+        self.current_exercise = REGISTRY.default  # Default exercise
+        self.auto_exercise = False  # Recognize the exercise instead of using the selector
         self.incorrect_reps = 0  # Track incorrect repetitions
         self.error_types = {}  # Track error types and their frequencies
         self.current_rep_has_error = False  # Flag to track if current rep has an error
@@ -598,14 +897,8 @@ class MainWindow(QMainWindow):
                 return
         
         # Update the guide video path based on the selected exercise
-        exercise_video_map = {
-            "Hiding Face": "hiding_face.mp4",
-            "Torso Rotation": "torso_rotation.mp4",
-            "Flank Stretch": "flank_stretch.mp4",
-        }
-        
-        if selected in exercise_video_map:
-            self.guide_video_path = os.path.join("videos", exercise_video_map[selected])
+        if selected in REGISTRY:
+            self.guide_video_path = REGISTRY[selected]["guide_video"]
             print(f"Guide video updated to: {self.guide_video_path}")
             
             # If we have a video player, update its source
@@ -644,9 +937,36 @@ class MainWindow(QMainWindow):
             
             # Update the current exercise
             self.current_exercise = selected
+            self.current_exercise_label.setText(selected)
         
         # No need for additional reset code - already handled above
 
+    def set_auto_exercise(self, enabled):
+        """Let the video thread recognize the exercise; the selector only shows the result"""
+        self.auto_exercise = enabled
+        self.exercise_selector.setEnabled(not enabled)
+        if self.thread:
+            self.thread.set_auto_exercise(enabled)
+
+    def change_model(self, model_file):
+        """Use another classifier; a running video thread swaps it in without stopping"""
+        if not model_file:
+            return
+        self.model_path = os.path.join(os.path.dirname(self.model_path), model_file)
+        if self.thread and self.thread.isRunning():
+            self.thread.set_model(self.model_path)
+
+    def on_exercise_recognized(self, name):
+        # Mirror the recognized exercise without resetting the session like change_exercise does
+        self.current_exercise = name
+        self.exercise_selector.blockSignals(True)
+        self.exercise_selector.setCurrentText(name)
+        self.exercise_selector.blockSignals(False)
+        self.current_exercise_label.setText(name)
+        # The guide ends the rep, so it is not restarted here; start_guide_video loads
+        # this exercise's guide at the next rep
+        self.guide_video_path = REGISTRY[name]["guide_video"]
+
     def _create_sidebar(self):
         # Create sidebar widget
         sidebar = QWidget()
@@ -961,9 +1281,7 @@ class MainWindow(QMainWindow):
 
         # Exercise Selector with improved styling
         self.exercise_selector = QComboBox()
-        self.exercise_selector.addItems(
-            ["Hiding Face", "Torso Rotation", "Flank Stretch"]
-        )
+        self.exercise_selector.addItems(REGISTRY.names)
         self.exercise_selector.currentTextChanged.connect(self.change_exercise)
         self.exercise_selector.setFont(self.button_font)
         self.exercise_selector.setStyleSheet(
@@ -994,8 +1312,24 @@ class MainWindow(QMainWindow):
             """
         )
 
+        # Classifier model selector; switching swaps the model without restarting the camera
+        self.model_selector = QComboBox()
+        self.model_selector.setFont(self.button_font)
+        model_dir = os.path.dirname(self.model_path) or "."
+        model_files = sorted(name for name in os.listdir(model_dir) if name.endswith(".tflite"))
+        self.model_selector.addItems(model_files)
+        self.model_selector.setCurrentText(os.path.basename(self.model_path))
+        self.model_selector.currentTextChanged.connect(self.change_model)
+        self.model_selector.setStyleSheet(self.exercise_selector.styleSheet())
+
+        # Automatic exercise recognition toggle
+        self.auto_exercise_checkbox = QCheckBox("Auto-detect")
+        self.auto_exercise_checkbox.setFont(self.button_font)
+        self.auto_exercise_checkbox.setStyleSheet(f"color: {constants.PRIMARY_800};")
+        self.auto_exercise_checkbox.toggled.connect(self.set_auto_exercise)
+
         # Selected Exercise Label
-        self.current_exercise_label = QLabel("Hiding Face")
+        self.current_exercise_label = QLabel(REGISTRY.default)
 
         # Buttons
         self.start_button = QPushButton("Start")
@@ -1027,6 +1361,10 @@ class MainWindow(QMainWindow):
         bottom_button_group.addWidget(self.start_button, alignment=Qt.AlignmentFlag.AlignCenter)
         bottom_button_group.addSpacing(20)  # Add some spacing between the buttons
         bottom_button_group.addWidget(self.exercise_selector, alignment=Qt.AlignmentFlag.AlignCenter)
+        bottom_button_group.addSpacing(10)
+        bottom_button_group.addWidget(self.auto_exercise_checkbox, alignment=Qt.AlignmentFlag.AlignCenter)
+        bottom_button_group.addSpacing(20)
+        bottom_button_group.addWidget(self.model_selector, alignment=Qt.AlignmentFlag.AlignCenter)
         bottom_button_group.addStretch(1)
 
 
@@ -1159,6 +1497,10 @@ class MainWindow(QMainWindow):
         # Clear the repetition message flag when start is clicked
         self.showing_rep_message = False
         
+        # Warm up the models and open the camera while the countdown runs
+        self._start_clicked_at = time.perf_counter()
+        self.prepare_video()
+
         self.countdown_seconds = 3  # Set your adjustable delay here (seconds)
         self._countdown_value = self.countdown_seconds
         self.start_button.setEnabled(False)
@@ -1177,18 +1519,35 @@ class MainWindow(QMainWindow):
             self.start_button.setEnabled(True)
             self.start_video()
 
-    def start_video(self):
+    def prepare_video(self):
+        """Create and arm the video thread, so it warms up and opens the camera before start_video()"""
         if self.thread is not None and self.thread.isRunning():
-            print("Thread already running!")
             return
         self.thread = VideoThread(self.model_path)
         self.thread.frame_update.connect(self.update_frame)
         self.thread.prediction_signal.connect(self.update_prediction)
         self.thread.enough_frames_signal.connect(self.start_guide_video)
-        self.thread.start()
+        self.thread.exercise_recognized.connect(self.on_exercise_recognized)
+        self.thread.set_current_exercise(self.current_exercise)
+        self.thread.set_auto_exercise(self.auto_exercise)
+        self.thread.arm(getattr(self, "_start_clicked_at", None))
+
+    def start_video(self):
+        if self.thread is None or not self.thread.isRunning():
+            self.prepare_video()
+        # Resumes a thread paused at the end of the last rep
+        self.thread.begin(getattr(self, "_start_clicked_at", None))
         print("Video started (feedback collecting frames)")
         # Do NOT start the guide video yet; wait for enough_frames_signal
 
+    def pause_video(self):
+        """Pause feedback between reps; the camera and pose model stay ready for the next rep"""
+        if self.thread and self.thread.isRunning():
+            self.thread.pause()
+            print("Pose estimation paused.")
+        if self.media_player:
+            self.media_player.stop()
+
     def stop_video(self):
         # Stop pose estimation thread
         if self.thread and self.thread.isRunning():
@@ -1216,8 +1575,8 @@ class MainWindow(QMainWindow):
         """Handles changes in the media player's status, like end of media."""
         if status == QMediaPlayer.MediaStatus.EndOfMedia:
             print("Guide video finished.")
-            # Stop both the video guide and the feedback (pose estimation thread)
-            self.stop_video()
+            # Pause both the video guide and the feedback (pose estimation thread)
+            self.pause_video()
             
             # Check if the completed repetition had an error
             completed_rep = self.current_rep
@@ -1247,6 +1606,9 @@ class MainWindow(QMainWindow):
                 # Record the completed exercise in the database if user is logged in
                 if self.session_manager and self.session_manager.is_logged_in() and self.current_session_id:
                     self.record_completed_exercise()
+
+                # The session is over, so release the camera and pose model
+                self.stop_video()
             else:
                 message = f"Repetition {completed_rep} completed. Click Start for next repetition."
             
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from pipeline.inference import InferenceEngine, create_interpreter
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def _summary(samples):
+    samples = np.asarray(samples) * 1e6
+    return f"median {np.median(samples):7.1f} us   p95 {np.percentile(samples, 95):7.1f} us"
+
+
+def benchmark_copying_path(model_path, frames, iterations):
+    """The original path: np.array(deque) -> astype -> set_tensor -> invoke -> get_tensor"""
+    _, interpreter = create_interpreter(model_path)
+    input_details = interpreter.get_input_details()
+    output_details = interpreter.get_output_details()
+    model_input = np.zeros(input_details[0]['shape'], dtype=np.float32)
+
+    overhead, invoke = [], []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        model_input[0] = np.array(frames)
+        input_data = model_input.astype(input_details[0]['dtype'])
+        interpreter.set_tensor(input_details[0]['index'], input_data)
+        t1 = time.perf_counter()
+        interpreter.invoke()
+        t2 = time.perf_counter()
+        yhat_prob = interpreter.get_tensor(output_details[0]['index'])
+        (yhat_prob > 0.5).astype(int)
+        t3 = time.perf_counter()
+        overhead.append((t1 - t0) + (t3 - t2))
+        invoke.append(t2 - t1)
+    return overhead, invoke
+
+
+def benchmark_view_path(model_path, frames, iterations):
+    """InferenceEngine: window written into the input buffer, output read through a view"""
+    engine = InferenceEngine(model_path)
+
+    overhead, invoke = [], []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        engine.write_window(frames)
+        t1 = time.perf_counter()
+        engine.interpreter.invoke()
+        t2 = time.perf_counter()
+        (engine._output() > 0.5).astype(int)
+        t3 = time.perf_counter()
+        overhead.append((t1 - t0) + (t3 - t2))
+        invoke.append(t2 - t1)
+    return overhead, invoke
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-inference overhead outside invoke()")
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.tflite"))
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Same per-frame layout as the video thread's keypoint deque
+    rng = np.random.default_rng(0)
+    frames = deque((rng.random(21) for _ in range(10)), maxlen=10)
+
+    for name, benchmark in (("copying", benchmark_copying_path), ("views", benchmark_view_path)):
+        benchmark(args.model, frames, 50)  # warm-up
+        overhead, invoke = benchmark(args.model, frames, args.iterations)
+        print(f"{name:8s} overhead: {_summary(overhead)}   invoke: {_summary(invoke)}")
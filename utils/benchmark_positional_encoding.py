@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+import numpy as np
+import tensorflow as tf
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from architecture.custom_model import PositionalEncoding
+from tf_lite_converter import CUSTOM_OBJECTS
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+class LegacyPositionalEncoding(PositionalEncoding):
+    """The previous implementation, which rebuilt the table on every forward pass"""
+
+    def call(self, inputs, training=None):
+        seq_len = tf.shape(inputs)[1]
+        position = tf.range(seq_len, dtype=tf.float32)[:, tf.newaxis]
+        div_term = tf.range(self.d_model, dtype=tf.float32)[tf.newaxis, :]
+        angle_rates = 1 / tf.pow(10000.0, (2 * (div_term // 2)) / tf.cast(self.d_model, tf.float32))
+        pos_encoding = position * angle_rates
+        pos_encoding = tf.concat(
+            [tf.sin(pos_encoding[:, 0::2]), tf.cos(pos_encoding[:, 1::2])], axis=-1
+        )
+        output = inputs + tf.expand_dims(pos_encoding, 0)
+        if self.use_learned_bias:
+            output += self.bias
+        return output
+
+
+def load_model(keras_path, layer_class):
+    custom_objects = dict(CUSTOM_OBJECTS, PositionalEncoding=layer_class)
+    return tf.keras.models.load_model(keras_path, custom_objects=custom_objects, compile=False)
+
+
+def time_keras(model, windows, iterations):
+    predict = tf.function(lambda x: model(x, training=False))
+    predict(windows)  # trace
+    start = time.perf_counter()
+    for _ in range(iterations):
+        predict(windows)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def time_layer(model, windows, iterations):
+    layer = next(layer for layer in model.layers if isinstance(layer, PositionalEncoding))
+    return time_keras(layer, windows, iterations)
+
+
+def convert(model):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS
+    ]
+    converter._experimental_lower_tensor_list_ops = False
+    return converter.convert()
+
+
+def time_tflite(tflite_model, window, iterations):
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    ops = Counter(op['op_name'] for op in interpreter._get_ops_details())
+    trig_ops = sum(count for name, count in ops.items() if name in ("SIN", "COS", "POW", "RANGE"))
+    try:
+        interpreter.allocate_tensors()
+    except RuntimeError:
+        # Flex ops need a TensorFlow build with the Flex delegate
+        return trig_ops, None
+    input_index = interpreter.get_input_details()[0]['index']
+    interpreter.set_tensor(input_index, window)
+    interpreter.invoke()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        interpreter.invoke()
+    return trig_ops, (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keras and TFLite cost of the cached positional-encoding table")
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.keras"))
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    window = np.random.default_rng(0).random((1, 10, 21)).astype(np.float32)
+    for name, layer_class in (("per-call table", LegacyPositionalEncoding), ("cached table", PositionalEncoding)):
+        model = load_model(args.model, layer_class)
+        layer_us = time_layer(model, window, args.iterations)
+        keras_us = time_keras(model, window, args.iterations)
+        trig_ops, tflite_us = time_tflite(convert(model), window, args.iterations)
+        tflite = f"{tflite_us:8.1f} us" if tflite_us is not None else "     n/a (Flex delegate unavailable)"
+        print(
+            f"{name:15s} layer {layer_us:7.1f} us   keras model {keras_us:8.1f} us   "
+            f"tflite {tflite}   trig/range ops in graph: {trig_ops}"
+        )
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def run_worker(backend, model_path):
+    """
+    Measures, in a fresh process, the time to import the backend, build the
+    interpreter and run the first inference, plus the peak RSS. Prints JSON.
+    """
+    import time
+
+    start = time.perf_counter()
+    import numpy as np
+    from pipeline.inference import BACKENDS, InferenceEngine
+
+    load = dict(BACKENDS)[backend]
+    load()
+    imported = time.perf_counter()
+
+    result = {"backend": backend, "import_s": imported - start}
+    try:
+        engine = InferenceEngine(model_path, backend=backend)
+        created = time.perf_counter()
+        engine.write_window(np.zeros(engine.input_shape[1:], dtype=np.float32))
+        (engine.invoke() > 0.5).astype(int)
+        first_inference = time.perf_counter()
+        result.update({
+            "create_s": created - imported,
+            "first_inference_s": first_inference - created,
+            "total_s": first_inference - start,
+        })
+    except RuntimeError as e:
+        # e.g. the model needs Flex ops, which only full TensorFlow provides
+        result["error"] = str(e).splitlines()[0]
+    result["peak_rss_mb"] = _peak_rss_mb()
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup time and memory of each TFLite backend")
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.tflite"))
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.model)
+        sys.exit(0)
+
+    from pipeline.inference import BACKENDS
+
+    results = []
+    for backend, _ in BACKENDS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend, "--model", args.model],
+            capture_output=True, text=True,
+        )
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if not lines:
+            # Import failed: backend not installed
+            print(f"{backend:15s} not available")
+            continue
+        result = json.loads(lines[-1])
+        results.append(result)
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+        if "error" in result:
+            print(f"{backend:15s} import {result['import_s']:.2f} s, rss {rss}, cannot run model: {result['error']}")
+        else:
+            print(
+                f"{backend:15s} import {result['import_s']:.2f} s, create {result['create_s']:.2f} s, "
+                f"first inference {result['first_inference_s'] * 1000:.1f} ms, "
+                f"total {result['total_s']:.2f} s, peak rss {rss}"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import argparse
+import itertools
+import subprocess
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def run_worker(model_path, pose_model_path, video_path, frames):
+    """
+    Runs the per-frame work of the video thread (color conversion, pose detection,
+    skeleton drawing, keypoint extraction and one inference every 10 frames)
+    headless, with the thread budget taken from REVAITALIZE_THREADS.
+    Prints the result as JSON.
+    """
+    # Must be imported first so the budget is exported before numba loads
+    from pipeline.threads import BUDGET, apply_thread_budget
+    import time
+    import cv2
+    import numpy as np
+    import mediapipe as mp
+    from pipeline.inference import InferenceEngine
+    from pipeline.landmarks import landmarks_to_array
+    from pipeline.pose import create_pose_landmarker
+    from pipeline.renderer import SkeletonRenderer
+    from test_page import extract_keypoints_numba
+
+    apply_thread_budget(BUDGET)
+
+    engine = InferenceEngine(model_path, num_threads=BUDGET["tflite"])
+
+    landmarker = None
+    if os.path.exists(pose_model_path):
+        landmarker = create_pose_landmarker(pose_model_path, num_poses=1)
+
+    capture = cv2.VideoCapture(video_path) if video_path else None
+    rng = np.random.default_rng(0)
+    synthetic = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    window = rng.random((10, 21)).astype(np.float32)
+    keypoints_of_interest = np.array([11, 12, 13, 14, 15, 16])
+    renderer = SkeletonRenderer()
+    frame_rgb = None
+
+    start = time.perf_counter()
+    for i in range(frames):
+        frame = synthetic
+        if capture is not None:
+            ret, frame = capture.read()
+            if not ret:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = capture.read()
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+        display = renderer.mirror(frame_rgb)
+        if landmarker is not None:
+            result = landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb))
+            if result.pose_landmarks:
+                landmark_array = landmarks_to_array(result.pose_landmarks[0])
+                renderer.draw(display, landmark_array)
+                extract_keypoints_numba(
+                    landmark_array[:, 0], landmark_array[:, 1], landmark_array[:, 2], keypoints_of_interest
+                )
+        if i % 10 == 0:
+            engine.write_window(window)
+            (engine.invoke() > 0.5).astype(int)
+    elapsed = time.perf_counter() - start
+
+    if landmarker is not None:
+        landmarker.close()
+    print(json.dumps({
+        "tflite": BUDGET["tflite"],
+        "opencv": BUDGET["opencv"],
+        "numba": BUDGET["numba"],
+        "pose": landmarker is not None,
+        "fps": frames / elapsed,
+    }))
+
+
+def benchmark_matrix(model_path, pose_model_path, video_path, frames, tflite_values, opencv_values, numba_values):
+    """Runs one worker process per thread configuration and returns the results"""
+    results = []
+    for tflite, opencv, numba in itertools.product(tflite_values, opencv_values, numba_values):
+        env = dict(os.environ)
+        env["REVAITALIZE_THREADS"] = f"tflite={tflite},opencv={opencv},numba={numba}"
+        # NUMBA_NUM_THREADS is only read at import; let the budget decide it
+        env.pop("NUMBA_NUM_THREADS", None)
+        command = [
+            sys.executable, os.path.abspath(__file__), "--worker",
+            "--model", model_path, "--pose-model", pose_model_path, "--frames", str(frames),
+        ]
+        if video_path:
+            command += ["--video", video_path]
+        output = subprocess.run(command, env=env, capture_output=True, text=True)
+        lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+        if output.returncode != 0 or not lines:
+            print(f"Failed tflite={tflite} opencv={opencv} numba={numba}:\n{output.stderr[-2000:]}")
+            continue
+        result = json.loads(lines[-1])
+        print(f"tflite={tflite:<3} opencv={opencv:<3} numba={numba:<3} {result['fps']:8.1f} fps")
+        results.append(result)
+    return results
+
+
+def print_matrix(results, default_budget):
+    """Prints the results as a table, marking the configuration the budget picks"""
+    print(f"\n{'tflite':>6} {'opencv':>6} {'numba':>6} {'fps':>8}")
+    for result in sorted(results, key=lambda r: -r["fps"]):
+        is_default = all(result[name] == default_budget[name] for name in ("tflite", "opencv", "numba"))
+        marker = "  <- default budget" if is_default else ""
+        print(f"{result['tflite']:>6} {result['opencv']:>6} {result['numba']:>6} {result['fps']:>8.1f}{marker}")
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="End-to-end fps for combinations of library thread counts")
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.tflite"))
+    parser.add_argument("--pose-model", default=os.path.join(MODELS_DIR, "pose_landmarker_full.task"))
+    parser.add_argument("--video", default=None, help="Video file to use instead of synthetic frames")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.model, args.pose_model, args.video, args.frames)
+        sys.exit(0)
+
+    from pipeline.threads import plan_thread_budget
+
+    counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    results = benchmark_matrix(
+        args.model, args.pose_model, args.video, args.frames,
+        tflite_values=counts, opencv_values=counts, numba_values=sorted({1, cores}),
+    )
+    print_matrix(results, plan_thread_budget())
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,78 @@
+import os
+import sys
+import argparse
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from evaluate_models import EXERCISES, THRESHOLD_MATRIX, JOINTS
+from pipeline.evaluation import evaluate, sweep_thresholds, thresholds_path, save_thresholds
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def choose_thresholds(precision, recall, f1, grid, objective, recall_target):
+    """
+    Picks one threshold per joint from the sweep. "f1" maximizes F1; "recall"
+    takes the highest threshold whose recall still meets the target (the most
+    precise one), falling back to the best-recall threshold if none does.
+    """
+    if objective == "f1":
+        return grid[f1.argmax(axis=0)]
+    meets_target = recall >= recall_target
+    # Highest grid index meeting the target, per joint
+    highest = len(grid) - 1 - meets_target[::-1].argmax(axis=0)
+    return np.where(meets_target.any(axis=0), grid[highest], grid[recall.argmax(axis=0)])
+
+
+def calibrate(probabilities, labels, exercise_index, grid, objective="f1", recall_target=0.9):
+    """Returns an (E, joints) threshold matrix, calibrated per exercise"""
+    calibrated = THRESHOLD_MATRIX.copy()
+    for e in range(len(EXERCISES)):
+        selected = exercise_index == e
+        if not selected.any():
+            print(f"No windows for {EXERCISES[e]}; keeping its current thresholds")
+            continue
+        precision, recall, f1 = sweep_thresholds(probabilities[selected], labels[selected], grid)
+        calibrated[e] = choose_thresholds(precision, recall, f1, grid, objective, recall_target)
+    return calibrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the per-exercise, per-joint thresholds")
+    parser.add_argument("probabilities", help="Cached .npz from evaluate_models.py --save-probabilities")
+    parser.add_argument("--model", default=None, help="Model the thresholds are for (default: from the cache name)")
+    parser.add_argument("--objective", choices=("f1", "recall"), default="f1")
+    parser.add_argument("--recall-target", type=float, default=0.9)
+    parser.add_argument("--step", type=float, default=0.005, help="Grid spacing")
+    parser.add_argument("--output", default=None, help="Thresholds file (default: next to the model)")
+    args = parser.parse_args()
+
+    with np.load(args.probabilities) as data:
+        probabilities = data["probabilities"]
+        labels = data["labels"].astype(bool)
+        exercise_index = data["exercise_index"]
+
+    grid = np.arange(args.step, 1.0, args.step)
+    calibrated = calibrate(probabilities, labels, exercise_index, grid, args.objective, args.recall_target)
+
+    before = evaluate(probabilities, labels, exercise_index, THRESHOLD_MATRIX)
+    after = evaluate(probabilities, labels, exercise_index, calibrated)
+    for e, exercise in enumerate(EXERCISES):
+        print(f"\n{exercise}: F1 {before['exercise']['f1'][e]:.3f} -> {after['exercise']['f1'][e]:.3f}, "
+              f"recall {before['exercise']['recall'][e]:.3f} -> {after['exercise']['recall'][e]:.3f}")
+        for j, joint in enumerate(JOINTS):
+            print(f"  {joint:15s} {THRESHOLD_MATRIX[e, j]:.3f} -> {calibrated[e, j]:.3f}   "
+                  f"F1 {before['exercise_joint']['f1'][e, j]:.3f} -> {after['exercise_joint']['f1'][e, j]:.3f}")
+
+    model = args.model or os.path.splitext(os.path.basename(args.probabilities))[0]
+    output = args.output or thresholds_path(os.path.join(MODELS_DIR, model + ".tflite"))
+    save_thresholds(
+        output, dict(zip(EXERCISES, calibrated)),
+        model=model, objective=args.objective,
+        recall_target=args.recall_target if args.objective == "recall" else None,
+        windows=int(len(probabilities)),
+    )
+    print(f"\nWrote {output}")
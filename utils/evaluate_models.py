@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from numpy_engine_parity import tflite_predict
+from pipeline.evaluation import load_dataset, batched_predict, evaluate
+from pipeline.exercises import REGISTRY
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+# Windows are grouped by one-hot position, so every position needs an exercise;
+# an unused slot (-1) would silently index the last exercise instead
+if (REGISTRY.from_encoding < 0).any():
+    raise ValueError(
+        f"One-hot positions {np.flatnonzero(REGISTRY.from_encoding < 0).tolist()} have no exercise in the registry"
+    )
+
+# Exercise names in one-hot order, and their deployed thresholds as an (E, joints) matrix
+EXERCISES = [REGISTRY.names[i] for i in REGISTRY.from_encoding]
+THRESHOLD_MATRIX = REGISTRY.threshold_matrix[REGISTRY.from_encoding]
+JOINTS = REGISTRY.joints
+
+
+def load_predictor(model_path, backend):
+    """Returns a batched (N, T, 21) -> (N, joints) function for the model"""
+    if backend == "numpy":
+        from pipeline.numpy_engine import NumpyEngine
+        return NumpyEngine(model_path).predict
+    if backend == "keras":
+        import tensorflow as tf
+        from tf_lite_converter import CUSTOM_OBJECTS
+        model = tf.keras.models.load_model(model_path, custom_objects=CUSTOM_OBJECTS, compile=False)
+        call = tf.function(lambda x: model(x, training=False))
+        return lambda windows: call(windows).numpy()
+    from pipeline.inference import InferenceEngine
+    engine = InferenceEngine(model_path)
+    return lambda windows: tflite_predict(engine, windows)
+
+
+def resolve_model(name, backend):
+    if os.path.exists(name):
+        return name
+    extension = ".tflite" if backend == "tflite" else ".keras"
+    return os.path.join(MODELS_DIR, name + extension)
+
+
+def print_metrics(name, metrics, seconds):
+    print(f"\n=== {name} ({seconds:.2f} s) overall F1 {metrics['overall']['f1']:.3f} "
+          f"P {metrics['overall']['precision']:.3f} R {metrics['overall']['recall']:.3f} ===")
+    print(f"{'':16s}" + "".join(f"{joint:>16s}" for joint in JOINTS) + f"{'all':>8s}")
+    for e, exercise in enumerate(EXERCISES):
+        row = "".join(
+            f"{metrics['exercise_joint']['f1'][e, j]:>9.3f} ({metrics['support'][e, j]:>4d})" for j in range(len(JOINTS))
+        )
+        print(f"{exercise:16s}{row}{metrics['exercise']['f1'][e]:>8.3f}")
+    print(f"{'all':16s}" + "".join(f"{f1:>16.3f}" for f1 in metrics["joint"]["f1"]))
+
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    return np.asarray(value).tolist()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-joint and per-exercise P/R/F1 at the deployed thresholds")
+    parser.add_argument("--dataset", required=True, help=".npz with windows (N, 10, 21) and labels (N, 6)")
+    parser.add_argument("--models", nargs="*", default=[f"run_{i}" for i in range(1, 7)])
+    parser.add_argument("--backend", choices=("numpy", "keras", "tflite"), default="numpy")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--save-probabilities", default=None,
+                        help="Directory to cache each model's probabilities in, for threshold calibration")
+    parser.add_argument("--output", default=None, help="Write the metrics as JSON")
+    args = parser.parse_args()
+
+    windows, labels, exercise_index = load_dataset(args.dataset)
+    print(f"{len(windows)} windows: " + ", ".join(
+        f"{name} {count}" for name, count in zip(EXERCISES, np.bincount(exercise_index, minlength=len(EXERCISES)))
+    ))
+
+    report = {}
+    for name in args.models:
+        model_path = resolve_model(name, args.backend)
+        predict = load_predictor(model_path, args.backend)
+        start = time.perf_counter()
+        probabilities = batched_predict(predict, windows, args.batch_size)
+        metrics = evaluate(probabilities, labels, exercise_index, THRESHOLD_MATRIX)
+        seconds = time.perf_counter() - start
+        print_metrics(name, metrics, seconds)
+        report[name] = _to_json(metrics)
+        if args.save_probabilities:
+            os.makedirs(args.save_probabilities, exist_ok=True)
+            np.savez(
+                os.path.join(args.save_probabilities, f"{os.path.splitext(os.path.basename(model_path))[0]}.npz"),
+                probabilities=probabilities, labels=labels, exercise_index=exercise_index,
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"exercises": EXERCISES, "joints": JOINTS, "thresholds": THRESHOLD_MATRIX.tolist(),
+                       "models": report}, f, indent=2)
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from evaluate_models import EXERCISES, THRESHOLD_MATRIX
+from pipeline.cascade import CorrectnessCascade, cascade_path, summary_features
+from pipeline.evaluation import load_dataset, load_thresholds, thresholds_path
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def fit_logistic(features, targets, epochs=2000, learning_rate=0.5, l2=1e-3):
+    """Full-batch gradient descent on standardized features; returns (weights, bias, mean, std)"""
+    mean = features.mean(axis=0)
+    std = features.std(axis=0) + 1e-6
+    x = (features - mean) / std
+    weights = np.zeros(x.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+        error = p - targets
+        weights -= learning_rate * (x.T @ error / len(x) + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return weights, bias, mean, std
+
+
+def choose_threshold(probabilities, targets, agreement):
+    """
+    Lowest confidence cut at which the windows called "Correct" agree with the
+    full model at least `agreement` of the time, i.e. the highest hit rate.
+    Returns (threshold, hit rate, agreement at that threshold).
+    """
+    order = np.argsort(-probabilities)
+    precision = np.cumsum(targets[order]) / np.arange(1, len(order) + 1)
+    acceptable = np.flatnonzero(precision >= agreement)
+    if len(acceptable) == 0:
+        return 1.0, 0.0, 0.0
+    last = acceptable[-1]
+    return float(probabilities[order][last]), (last + 1) / len(order), float(precision[last])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the stage-1 'Correct' pre-classifier from recorded probabilities")
+    parser.add_argument("probabilities", help="Cached .npz from evaluate_models.py --save-probabilities")
+    parser.add_argument("--dataset", required=True, help="The .npz dataset the probabilities were computed on")
+    parser.add_argument("--model", default=None, help="Model the cascade is for (default: from the cache name)")
+    parser.add_argument("--agreement", type=float, default=0.99,
+                        help="Minimum share of stage-1 'Correct' calls the full model agrees with")
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--validation-split", type=float, default=0.2,
+                        help="Share of windows held out to choose the threshold, in [0, 1)")
+    parser.add_argument("--output", default=None, help="Cascade file (default: next to the model)")
+    args = parser.parse_args()
+    if not 0.0 <= args.validation_split < 1.0:
+        parser.error("--validation-split must be at least 0 and below 1, so some windows are left to train on")
+
+    model = args.model or os.path.splitext(os.path.basename(args.probabilities))[0]
+    model_path = os.path.join(MODELS_DIR, model + ".tflite")
+    windows, _, _ = load_dataset(args.dataset)
+    with np.load(args.probabilities) as data:
+        probabilities = data["probabilities"]
+        exercise_index = data["exercise_index"]
+
+    # The full model's decision under the thresholds the app will use
+    thresholds = THRESHOLD_MATRIX.copy()
+    for name, values in load_thresholds(thresholds_path(model_path)).items():
+        thresholds[EXERCISES.index(name)] = values
+    targets = (~(probabilities > thresholds[exercise_index]).any(axis=1)).astype(np.float64)
+    print(f"{len(targets)} windows, {targets.mean():.1%} called Correct by {model}")
+
+    features = summary_features(windows)
+    split = np.random.default_rng(0).permutation(len(features))
+    validation = split[:int(len(split) * args.validation_split)]
+    train = split[len(validation):]
+
+    weights, bias, mean, std = fit_logistic(features[train], targets[train], epochs=args.epochs)
+    cascade = CorrectnessCascade(weights, bias, mean, std, threshold=1.0)
+    held_out = validation
+    if len(held_out) == 0:
+        print("No validation split; choosing the threshold on the training windows")
+        held_out = train
+    held_out_probabilities = cascade.probability_correct(windows[held_out])
+    accuracy = ((held_out_probabilities >= 0.5) == targets[held_out]).mean()
+    threshold, hit_rate, agreement = choose_threshold(held_out_probabilities, targets[held_out], args.agreement)
+    cascade.threshold = threshold
+    print(f"{'Validation' if len(validation) else 'Training'} accuracy {accuracy:.3f}; at threshold {threshold:.3f} stage 1 answers "
+          f"{hit_rate:.1%} of windows with {agreement:.2%} agreement")
+
+    timed = held_out[:1000]
+    start = time.perf_counter()
+    for window in windows[timed]:
+        cascade.probability_correct(window)
+    stage1_us = (time.perf_counter() - start) / len(timed) * 1e6
+    print(f"Stage 1 costs {stage1_us:.1f} us per window; the full model is skipped on {hit_rate:.1%} of windows")
+
+    output = args.output or cascade_path(model_path)
+    cascade.save(output, hit_rate=hit_rate, agreement=agreement)
+    print(f"Wrote {output}")
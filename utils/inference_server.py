@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import socket
+import argparse
+import socketserver
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from pipeline.batching import MicroBatcher
+from pipeline.evaluation import load_thresholds, thresholds_path
+from pipeline.exercises import REGISTRY
+from pipeline.feedback import get_evaluation_from_binary
+from pipeline.stations import KEYPOINTS_OF_INTEREST
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def window_from_request(data):
+    """
+    Builds the (T, encoding + keypoints) model input from a request body and
+    returns (window, exercise index). Accepts one of:
+    - "window": the full model input, exercise read from its one-hot encoding
+    - "keypoints": (T, 18) tracked joint coordinates, plus "exercise"
+    - "landmarks": (T, 33, 3+) raw pose landmarks, plus "exercise"
+    """
+    if not isinstance(data, dict):
+        raise ValueError("The request body must be a JSON object")
+    if "window" in data:
+        window = np.asarray(data["window"], dtype=np.float32)
+        if window.ndim != 2 or window.shape[1] <= REGISTRY.encoding_matrix.shape[1]:
+            raise ValueError(f"'window' must be (T, features), got {window.shape}")
+        encoding = window[:, :REGISTRY.encoding_matrix.shape[1]]
+        # Every frame must carry exactly one registered exercise's one-hot encoding
+        matches = np.flatnonzero((REGISTRY.encoding_matrix == encoding[0]).all(axis=1))
+        if len(matches) != 1 or not (encoding == encoding[0]).all():
+            raise ValueError("The window's encoding does not match a registered exercise")
+        return window, int(matches[0])
+
+    exercise = data.get("exercise")
+    if exercise not in REGISTRY:
+        raise ValueError(f"'exercise' must be one of {', '.join(REGISTRY.names)}")
+    exercise_index = REGISTRY.index[exercise]
+    if "landmarks" in data:
+        landmarks = np.asarray(data["landmarks"], dtype=np.float32)
+        if landmarks.ndim != 3 or landmarks.shape[1] <= KEYPOINTS_OF_INTEREST.max() or landmarks.shape[2] < 3:
+            raise ValueError(f"'landmarks' must be (T, 33, 3+), got {landmarks.shape}")
+        keypoints = landmarks[:, KEYPOINTS_OF_INTEREST, :3].reshape(len(landmarks), -1)
+    elif "keypoints" in data:
+        keypoints = np.asarray(data["keypoints"], dtype=np.float32)
+        if keypoints.ndim != 2:
+            raise ValueError(f"'keypoints' must be (T, keypoints), got {keypoints.shape}")
+    else:
+        raise ValueError("The request needs 'window', 'keypoints' or 'landmarks'")
+    encoding = np.broadcast_to(REGISTRY.encoding_matrix[exercise_index], (len(keypoints), REGISTRY.encoding_matrix.shape[1]))
+    return np.concatenate((encoding, keypoints), axis=1), exercise_index
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """
+    POST /predict with a JSON body (see window_from_request); returns the
+    per-joint probabilities, the flagged joints and the feedback label.
+    GET /health returns the batcher's counters.
+    """
+
+    # Keep-alive, so clients are not paying for a connection per request
+    protocol_version = "HTTP/1.1"
+    batcher = None
+    threshold_matrix = None
+    quiet = True
+    # Seconds to wait for the batcher before answering 503
+    predict_timeout = 5.0
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._reply(200, {"status": "ok", **self.batcher.stats()})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            window, exercise_index = window_from_request(json.loads(body))
+            future = self.batcher.submit(window)
+        except (ValueError, TypeError) as e:
+            self._reply(400, {"error": str(e)})
+            return
+        try:
+            probabilities = future.result(self.predict_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._reply(503, {"error": f"No result within {self.predict_timeout} s"})
+            return
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+            return
+        errors = (probabilities > self.threshold_matrix[exercise_index]).astype(int)
+        label, error_indices = get_evaluation_from_binary(errors, return_error_indices=True)
+        self._reply(200, {
+            "exercise": REGISTRY.names[exercise_index],
+            "probabilities": probabilities.tolist(),
+            "errors": errors.tolist(),
+            "error_indices": error_indices,
+            "label": label,
+        })
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+def make_server(batcher, threshold_matrix, host="127.0.0.1", port=8765, unix_socket=None, quiet=True,
+                predict_timeout=5.0):
+    """An HTTP server over localhost or, if unix_socket is given, over that Unix socket"""
+    handler = type("BoundInferenceHandler", (InferenceHandler,), {
+        "batcher": batcher, "threshold_matrix": threshold_matrix, "quiet": quiet,
+        "predict_timeout": predict_timeout,
+    })
+    if unix_socket:
+        return UnixHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the classifier locally, merging concurrent requests into batches")
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.tflite"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", default=None, help="Serve on this Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0,
+                        help="How long to wait for more requests after the first one of a batch")
+    parser.add_argument("--threads", type=int, default=None, help="TFLite threads (default: tuned for this machine)")
+    parser.add_argument("--request-timeout", type=float, default=5.0,
+                        help="Seconds a request may wait for its batch before the server answers 503")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    if args.threads:
+        settings = {"num_threads": args.threads}
+    else:
+        from pipeline.tuning import tuned_settings
+        settings = tuned_settings(args.model)
+    batcher = MicroBatcher(args.model, args.max_batch, args.batch_window_ms, **settings).start()
+    threshold_matrix = REGISTRY.thresholds_with(load_thresholds(thresholds_path(args.model)))
+    server = make_server(batcher, threshold_matrix, args.host, args.port, args.unix_socket,
+                         quiet=not args.verbose, predict_timeout=args.request_timeout)
+    where = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"Serving {os.path.basename(args.model)} on {where} "
+          f"(batches of up to {args.max_batch}, {args.batch_window_ms} ms window)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+        print(f"Served {json.dumps(batcher.stats())}")
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from pipeline.exercises import REGISTRY
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inference_server.py")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=10):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def connect(host, port, unix_socket):
+    if unix_socket:
+        return UnixHTTPConnection(unix_socket)
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.connect()
+    connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return connection
+
+
+def request(connection, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else None
+    headers = {"Content-Type": "application/json"} if body else {}
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    data = json.loads(response.read())
+    if response.status != 200:
+        raise RuntimeError(f"{response.status}: {data.get('error')}")
+    return data
+
+
+def make_payloads(count, frames=10, seed=0):
+    """Random keypoint windows spread over the registered exercises"""
+    rng = np.random.default_rng(seed)
+    return [
+        {"exercise": REGISTRY.names[i % len(REGISTRY)], "keypoints": rng.random((frames, 18)).round(4).tolist()}
+        for i in range(count)
+    ]
+
+
+def run_load(host, port, unix_socket, concurrency, duration, payloads, warmup=0.5, retry_delay=0.05):
+    """
+    Closed loop: `concurrency` clients each send a request as soon as their last
+    one returns, for `duration` seconds after a warm-up. Returns throughput and
+    latency percentiles, plus the server's mean batch size over the run.
+    A request or reconnect that fails counts as a failure and is retried after
+    retry_delay seconds.
+    """
+    latencies = [[] for _ in range(concurrency)]
+    failures = [0] * concurrency
+    begin = time.perf_counter() + warmup
+    end = begin + duration
+
+    def client(c):
+        connection = None
+        i = c
+        while True:
+            start = time.perf_counter()
+            if start >= end:
+                break
+            try:
+                if connection is None:
+                    connection = connect(host, port, unix_socket)
+                request(connection, "POST", "/predict", payloads[i % len(payloads)])
+            except (OSError, RuntimeError, http.client.HTTPException):
+                # Counted, then retried on a new connection; back off in case the server is down
+                failures[c] += 1
+                if connection is not None:
+                    connection.close()
+                    connection = None
+                time.sleep(retry_delay)
+                continue
+            if start >= begin:
+                latencies[c].append(time.perf_counter() - start)
+            i += concurrency
+        if connection is not None:
+            connection.close()
+
+    health = connect(host, port, unix_socket)
+    before = request(health, "GET", "/health")
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    after = request(health, "GET", "/health")
+    health.close()
+
+    samples = np.concatenate([np.array(l) for l in latencies]) * 1000.0 if any(latencies) else np.zeros(1)
+    # Includes warm-up requests, which only shifts the mean batch size slightly
+    batches = after["batches"] - before["batches"]
+    return {
+        "concurrency": concurrency,
+        "requests": int(sum(len(l) for l in latencies)),
+        "failures": int(sum(failures)),
+        "throughput": sum(len(l) for l in latencies) / duration,
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_batch_size": (after["requests"] - before["requests"]) / batches if batches else 0.0,
+    }
+
+
+def start_server(model_path, batch_window_ms, max_batch, host, port, unix_socket, timeout=120.0):
+    """Starts inference_server.py and waits until it answers /health"""
+    command = [sys.executable, SERVER, "--model", model_path, "--max-batch", str(max_batch),
+               "--batch-window-ms", str(batch_window_ms), "--host", host, "--port", str(port)]
+    if unix_socket:
+        command += ["--unix-socket", unix_socket]
+    process = subprocess.Popen(command)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with code {process.returncode}")
+        try:
+            connection = connect(host, port, unix_socket)
+            request(connection, "GET", "/health")
+            connection.close()
+            return process
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The server did not come up in time")
+
+
+def _window_label(batch_window_ms):
+    # None when loading an external server, whose window is unknown
+    return "external" if batch_window_ms is None else f"{batch_window_ms:g} ms"
+
+
+def print_curves(results):
+    print(f"\n{'window':>9} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for result in results:
+        print(f"{_window_label(result['batch_window_ms']):>9} {result['concurrency']:>7} {result['throughput']:>9.1f} "
+              f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{result['mean_batch_size']:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Throughput and latency of the inference server versus batch window and concurrency"
+    )
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.tflite"))
+    parser.add_argument("--batch-windows", type=float, nargs="+", default=[0.0, 1.0, 2.0, 5.0],
+                        help="Server batch windows to sweep, in ms; a server is started for each")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per measurement")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix-socket", default=None)
+    parser.add_argument("--external", action="store_true",
+                        help="Load an already running server instead of starting one per batch window")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    payloads = make_payloads(256)
+    results = []
+    for batch_window_ms in ([None] if args.external else args.batch_windows):
+        process = None
+        if batch_window_ms is not None:
+            process = start_server(args.model, batch_window_ms, args.max_batch, args.host, args.port, args.unix_socket)
+        try:
+            for concurrency in args.concurrency:
+                result = run_load(args.host, args.port, args.unix_socket, concurrency, args.duration, payloads)
+                result["batch_window_ms"] = batch_window_ms
+                print(f"window {_window_label(batch_window_ms)}, {concurrency} clients: "
+                      f"{result['throughput']:.1f} req/s, p50 {result['p50_ms']:.2f} ms, "
+                      f"p99 {result['p99_ms']:.2f} ms, batch {result['mean_batch_size']:.2f}")
+                results.append(result)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    print_curves(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"model": os.path.basename(args.model), "max_batch": args.max_batch, "results": results}, f, indent=2)
+        print(f"Wrote {args.output}")
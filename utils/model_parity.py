@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+
+import numpy as np
+import tensorflow as tf
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from tf_lite_converter import CUSTOM_OBJECTS
+from numpy_engine_parity import representative_windows, tflite_predict
+from pipeline.exercises import REGISTRY
+from pipeline.inference import InferenceEngine
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def _latency_ms(predict_one, windows, repeats):
+    predict_one(windows[0])  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for window in windows:
+            predict_one(window)
+    return (time.perf_counter() - start) / (repeats * len(windows)) * 1000.0
+
+
+def compare_model(name, keypoint_windows, repeats):
+    """
+    Runs every exercise's windows through the .keras and .tflite versions of a
+    model and returns per-joint differences, threshold flips and latencies.
+    """
+    keras_model = tf.keras.models.load_model(
+        os.path.join(MODELS_DIR, f"{name}.keras"), custom_objects=CUSTOM_OBJECTS, compile=False
+    )
+    keras_call = tf.function(lambda x: keras_model(x, training=False))
+    result = {"model": name}
+    try:
+        engine = InferenceEngine(os.path.join(MODELS_DIR, f"{name}.tflite"))
+        result["tflite_backend"] = engine.backend
+    except RuntimeError as e:
+        engine = None
+        result["tflite_error"] = str(e).splitlines()[0]
+
+    difference = np.zeros(len(REGISTRY.joints))
+    result["exercises"] = {}
+    for e, exercise in enumerate(REGISTRY.names):
+        windows = keypoint_windows.copy()
+        windows[:, :, :3] = REGISTRY.encoding_matrix[e]
+        keras_probs = keras_call(windows).numpy()
+        thresholds = REGISTRY.threshold_matrix[e]
+        entry = {"keras_positive_rate": (keras_probs > thresholds).mean(axis=0).round(4).tolist()}
+        if engine is not None:
+            tflite_probs = tflite_predict(engine, windows)
+            difference = np.maximum(difference, np.abs(keras_probs - tflite_probs).max(axis=0))
+            flips = (keras_probs > thresholds) != (tflite_probs > thresholds)
+            entry.update({
+                "flip_rate": float(flips.any(axis=1).mean()),
+                "flip_rate_per_joint": flips.mean(axis=0).round(6).tolist(),
+            })
+        result["exercises"][exercise] = entry
+
+    latency_windows = keypoint_windows[:32]
+    result["keras_ms_per_window"] = _latency_ms(lambda w: keras_call(w[np.newaxis]), latency_windows, repeats)
+    if engine is not None:
+        result["max_abs_diff_per_joint"] = dict(zip(REGISTRY.joints, difference.tolist()))
+        result["tflite_ms_per_window"] = _latency_ms(
+            lambda w: (engine.write_window(w), engine.invoke()), latency_windows, repeats
+        )
+    return result
+
+
+def print_result(result):
+    name = result["model"]
+    line = f"{name}: keras {result['keras_ms_per_window']:.3f} ms/window"
+    if "tflite_error" in result:
+        print(f"{line}, tflite cannot run here ({result['tflite_error'][:100]})")
+        return
+    print(f"{line}, tflite ({result['tflite_backend']}) {result['tflite_ms_per_window']:.3f} ms/window")
+    print("  max abs diff: " + "  ".join(f"{joint} {value:.2e}" for joint, value in result["max_abs_diff_per_joint"].items()))
+    for exercise, entry in result["exercises"].items():
+        print(f"  {exercise:15s} windows with a flipped joint: {entry['flip_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keras vs TFLite parity and latency for every model run")
+    parser.add_argument("--models", nargs="*", default=[f"run_{i}" for i in range(1, 7)])
+    parser.add_argument("--windows", type=int, default=512, help="Random windows, if --windows-file is not given")
+    parser.add_argument("--windows-file", default=None, help=".npy of recorded (N, 10, 21) windows")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="model_parity.jsonl", help="Results are appended as one JSON line per run")
+    args = parser.parse_args()
+
+    if args.windows_file:
+        windows = np.load(args.windows_file).astype(np.float32)
+    else:
+        windows = representative_windows(args.windows)
+
+    results = []
+    for name in args.models:
+        result = compare_model(name, windows, args.repeats)
+        print_result(result)
+        results.append(result)
+
+    record = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "tensorflow": tf.__version__,
+        "windows": len(windows),
+        "windows_file": args.windows_file,
+        "results": results,
+    }
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Appended results to {args.output}")
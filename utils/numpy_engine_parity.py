@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from pipeline.inference import InferenceEngine
+from pipeline.numpy_engine import NumpyEngine
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+def representative_windows(count, steps=10, seed=0):
+    """Random keypoint windows with each exercise's one-hot encoding in the first 3 features"""
+    rng = np.random.default_rng(seed)
+    windows = rng.random((count, steps, 21)).astype(np.float32)
+    windows[:, :, :3] = np.eye(3, dtype=np.float32)[np.arange(count) % 3][:, np.newaxis, :]
+    return windows
+
+
+def tflite_predict(engine, windows):
+    outputs = np.empty((len(windows), engine.output_shape[-1]), dtype=np.float32)
+    for i, window in enumerate(windows):
+        engine.write_window(window)
+        outputs[i] = engine.invoke()[0]
+    return outputs
+
+
+def _throughput(predict, windows, repeats):
+    predict(windows)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(windows)
+    return repeats * len(windows) / (time.perf_counter() - start)
+
+
+def keras_predict(keras_path, windows):
+    import tensorflow as tf
+    from tf_lite_converter import CUSTOM_OBJECTS
+
+    model = tf.keras.models.load_model(keras_path, custom_objects=CUSTOM_OBJECTS, compile=False)
+    return model(windows, training=False).numpy()
+
+
+def check_model(name, windows, tolerance, batch_size, repeats):
+    """
+    Returns True if the NumPy engine matches the reference within tolerance,
+    False if it does not, and None if no reference could be run. The reference
+    is the .tflite model, or the Keras model when the .tflite needs ops this
+    runtime lacks (e.g. Flex).
+    """
+    keras_path = os.path.join(MODELS_DIR, f"{name}.keras")
+    numpy_engine = NumpyEngine(keras_path)
+    expected = None
+    tflite_engine = None
+    try:
+        tflite_engine = InferenceEngine(os.path.join(MODELS_DIR, f"{name}.tflite"))
+        expected = tflite_predict(tflite_engine, windows)
+        reference = "tflite"
+    except RuntimeError as e:
+        print(f"{name}: cannot run .tflite here ({str(e).splitlines()[0][:120]}); comparing against Keras")
+        tflite_engine = None
+        try:
+            expected = keras_predict(keras_path, windows)
+            reference = "keras"
+        except ImportError as e:
+            print(f"{name}: NOT CHECKED, no reference model can run here ({e})")
+
+    predicted = numpy_engine.predict(windows)
+    passed = None
+    if expected is not None:
+        difference = np.abs(predicted - expected).max()
+        passed = bool(difference <= tolerance)
+        print(f"{name}: max abs difference vs {reference} {difference:.2e} {'ok' if passed else 'FAIL'}")
+
+    single = _throughput(lambda w: [numpy_engine.predict(x[np.newaxis]) for x in w], windows[:batch_size], repeats)
+    batched = _throughput(numpy_engine.predict, windows[:batch_size], repeats)
+    line = f"{name}: numpy single {single:8.0f} windows/s   numpy batched({batch_size}) {batched:8.0f} windows/s"
+    if tflite_engine is not None:
+        tflite = _throughput(lambda w: tflite_predict(tflite_engine, w), windows[:batch_size], repeats)
+        line += f"   tflite single {tflite:8.0f} windows/s"
+    print(line)
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity and throughput of the NumPy engine against the .tflite models")
+    parser.add_argument("--models", nargs="*", default=[f"run_{i}" for i in range(1, 7)])
+    parser.add_argument("--windows", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    windows = representative_windows(args.windows)
+    results = {name: check_model(name, windows, args.tolerance, args.batch_size, args.repeats) for name in args.models}
+    failed = [name for name, passed in results.items() if passed is False]
+    unchecked = [name for name, passed in results.items() if passed is None]
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    if unchecked:
+        print(f"Not checked: {', '.join(unchecked)}")
+    # 1: a mismatch; 2: nothing to compare against, which must not pass silently
+    if failed:
+        sys.exit(1)
+    if unchecked:
+        sys.exit(2)
@@ -0,0 +1,198 @@
+import os
+import re
+import sys
+import glob
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+import numpy as np
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from numpy_engine_parity import representative_windows
+from pipeline.inference import BACKENDS
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+# A row of benchmark_model's "Run Order" table:
+# [node type] [first] [avg ms] [%] [cdf%] [mem KB] [times called] [Name]
+PROFILE_ROW = re.compile(
+    r"^\s*(\S+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)%\s+([\d.]+)%\s+([\d.]+)\s+(\d+)\s+(.*)$"
+)
+
+
+def _load_interpreter(model_path):
+    # Any installed backend can read the graph, even if it cannot run Flex ops
+    for name, load in BACKENDS:
+        try:
+            interpreter_class, _ = load()
+            return interpreter_class(model_path=model_path)
+        except ImportError:
+            continue
+    raise RuntimeError("No TFLite backend is installed")
+
+
+def _tensor_bytes(tensor):
+    if tensor["dtype"] == np.object_:
+        return None  # variant tensors (TensorList handles) have no fixed size
+    return int(np.prod(tensor["shape"])) * np.dtype(tensor["dtype"]).itemsize
+
+
+def _category(op_name, tensor_names):
+    """Groups an op by the part of the model it belongs to"""
+    names = " ".join(tensor_names).lower()
+    if op_name.startswith("Flex"):
+        return "flex"
+    if op_name == "WHILE" or "lstm" in names:
+        return "lstm"
+    if "attention" in names:
+        return "attention"
+    return "other"
+
+
+def describe_ops(model_path):
+    """Static list of the model's ops with their kind and output tensor sizes"""
+    interpreter = _load_interpreter(model_path)
+    tensors = {tensor["index"]: tensor for tensor in interpreter.get_tensor_details()}
+    ops = []
+    for op in interpreter._get_ops_details():
+        outputs = [tensors[i] for i in op["outputs"] if i in tensors]
+        sizes = [_tensor_bytes(tensor) for tensor in outputs]
+        ops.append({
+            "index": op["index"],
+            "op": op["op_name"],
+            "kind": "flex" if op["op_name"].startswith("Flex") else "builtin",
+            "category": _category(op["op_name"], [tensor["name"] for tensor in outputs]),
+            "output_shapes": [tensor["shape"].tolist() for tensor in outputs],
+            "output_bytes": None if None in sizes else sum(sizes),
+        })
+    input_details = interpreter.get_input_details()[0]
+    return ops, input_details
+
+
+def _find_benchmark_binary(path=None):
+    for candidate in (path, "benchmark_model_plus_flex", "benchmark_model"):
+        if candidate and (os.path.exists(candidate) or shutil.which(candidate)):
+            return candidate if os.path.exists(candidate) else shutil.which(candidate)
+    return None
+
+
+def profile_ops(binary, model_path, input_details, windows, num_runs, num_threads):
+    """
+    Runs benchmark_model with op profiling once per window and returns the
+    average milliseconds per node index, averaged over the windows.
+    """
+    totals = defaultdict(float)
+    names = {}
+    # ':' separates name and file in --input_layer_value_files, so it is escaped as '::'
+    input_name = input_details["name"].replace(":", "::")
+    shape = ",".join(str(d) for d in input_details["shape"])
+    with tempfile.TemporaryDirectory() as directory:
+        for i, window in enumerate(windows):
+            value_file = os.path.join(directory, f"window_{i}.bin")
+            window[np.newaxis].astype(input_details["dtype"]).tofile(value_file)
+            output = subprocess.run([
+                binary, f"--graph={model_path}", f"--num_runs={num_runs}", f"--num_threads={num_threads}",
+                "--enable_op_profiling=true", f"--input_layer={input_details['name']}",
+                f"--input_layer_shape={shape}", f"--input_layer_value_files={input_name}:{value_file}",
+            ], capture_output=True, text=True)
+            if output.returncode != 0:
+                raise RuntimeError(output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "benchmark failed")
+            in_run_order = False
+            for line in output.stdout.splitlines() + output.stderr.splitlines():
+                if "Run Order" in line:
+                    in_run_order = True
+                    continue
+                if in_run_order and ("Top by" in line or not line.strip()):
+                    if "Top by" in line:
+                        break
+                    continue
+                match = PROFILE_ROW.match(line) if in_run_order else None
+                if match:
+                    node_type, _, avg_ms, _, _, _, _, name = match.groups()
+                    index = name.rsplit(":", 1)[-1]
+                    key = int(index) if index.isdigit() else name
+                    totals[key] += float(avg_ms) / len(windows)
+                    names[key] = node_type
+    return totals, names
+
+
+def print_report(name, ops, timings=None, node_types=None):
+    flex = sum(op["kind"] == "flex" for op in ops)
+    print(f"\n=== {name}: {len(ops)} ops ({flex} Flex, {len(ops) - flex} builtin) ===")
+    counts = defaultdict(int)
+    for op in ops:
+        counts[(op["op"], op["kind"])] += 1
+    for (op_name, kind), count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"  {op_name:28s} {kind:8s} x{count}")
+
+    largest = sorted((op for op in ops if op["output_bytes"]), key=lambda op: -op["output_bytes"])[:10]
+    print("\n  Largest output tensors:")
+    for op in largest:
+        print(f"  {op['index']:>4} {op['op']:28s} {str(op['output_shapes']):30s} {op['output_bytes']:>8} B")
+
+    if not timings:
+        return
+    by_index = {op["index"]: op for op in ops}
+    total_ms = sum(timings.values())
+    print(f"\n  Ranked per-op latency (total {total_ms:.3f} ms):")
+    for key, ms in sorted(timings.items(), key=lambda item: -item[1])[:25]:
+        op = by_index.get(key)
+        label = op["op"] if op else node_types.get(key, str(key))
+        category = op["category"] if op else "-"
+        print(f"  {str(key):>6} {label:28s} {category:10s} {ms:8.4f} ms {ms / total_ms * 100:6.1f}%")
+
+    by_category = defaultdict(float)
+    for key, ms in timings.items():
+        by_category[by_index[key]["category"] if key in by_index else "delegate/other"] += ms
+    print("\n  By category:")
+    for category, ms in sorted(by_category.items(), key=lambda item: -item[1]):
+        print(f"  {category:16s} {ms:8.4f} ms {ms / total_ms * 100:6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-operator breakdown of the TFLite classifiers")
+    parser.add_argument("--models", nargs="*", default=None, help="Model files (default: models/run_*.tflite)")
+    parser.add_argument("--benchmark-binary", default=None,
+                        help="Path to TFLite's benchmark_model (the _plus_flex build for Flex models)")
+    parser.add_argument("--windows", type=int, default=4, help="Representative windows to profile")
+    parser.add_argument("--num-runs", type=int, default=50)
+    parser.add_argument("--num-threads", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    models = args.models or sorted(glob.glob(os.path.join(MODELS_DIR, "run_*.tflite")))
+    binary = _find_benchmark_binary(args.benchmark_binary)
+    if binary is None:
+        print("benchmark_model not found; only the static op report is available. "
+              "Build it from tensorflow/lite/tools/benchmark and pass --benchmark-binary.")
+    windows = representative_windows(args.windows)
+
+    report = {}
+    for model_path in models:
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        ops, input_details = describe_ops(model_path)
+        timings, node_types, error = None, None, None
+        if binary is not None:
+            try:
+                timings, node_types = profile_ops(
+                    binary, model_path, input_details, windows, args.num_runs, args.num_threads
+                )
+            except RuntimeError as e:
+                error = str(e)
+                print(f"{name}: profiling failed: {error}")
+        print_report(name, ops, timings, node_types)
+        report[name] = {
+            "ops": ops,
+            "timings_ms": {str(key): ms for key, ms in (timings or {}).items()},
+            "error": error,
+        }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import argparse
+
+# Ensure parent directory is in sys.path for import
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+# Must be imported first so the budget is exported before numba loads
+from pipeline.threads import BUDGET, apply_thread_budget
+import cv2
+import numpy as np
+import mediapipe as mp
+
+from pipeline.exercises import REGISTRY
+from pipeline.feedback import get_evaluation_from_binary
+from pipeline.landmarks import landmarks_to_array
+from pipeline.pose import create_pose_landmarker
+from pipeline.renderer import SkeletonRenderer
+from pipeline.stations import Station, SharedClassifier, match_poses
+from pipeline.tuning import tuned_settings
+
+apply_thread_budget(BUDGET)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+
+
+class Source:
+    """One camera (or video file) with its own landmarker and the stations it feeds"""
+
+    def __init__(self, source, stations):
+        self.source = source
+        self.capture = cv2.VideoCapture(int(source) if source.isdigit() else source)
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Could not open {source}")
+        self.is_file = not source.isdigit()
+        self.stations = stations
+        # All landmarkers share one in-memory copy of the .task file
+        self.landmarker = create_pose_landmarker(num_poses=len(stations))
+        self.renderer = SkeletonRenderer()
+        self.frame_rgb = None
+        self.pairs = []
+
+    def step(self):
+        """Reads a frame, detects poses and feeds them to the stations. Returns the frame, or None at the end."""
+        ret, frame = self.capture.read()
+        if not ret and self.is_file:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        if not ret:
+            return None
+        self.frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.frame_rgb)
+        result = self.landmarker.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=self.frame_rgb))
+        landmark_arrays = [landmarks_to_array(landmarks) for landmarks in result.pose_landmarks]
+        self.pairs = match_poses(self.stations, landmark_arrays)
+        for station, landmark_array in self.pairs:
+            station.push(landmark_array)
+        return self.frame_rgb
+
+    def draw(self):
+        display = self.renderer.mirror(self.frame_rgb)
+        for station, landmark_array in self.pairs:
+            label, error_indices = describe(station)
+            self.renderer.draw(display, landmark_array, error_indices)
+            x = int((1.0 - station.center[0]) * display.shape[1])
+            cv2.putText(display, f"{station.name}: {label}", (max(0, x - 80), 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        return display
+
+    def close(self):
+        self.landmarker.close()
+        self.capture.release()
+
+
+def describe(station):
+    if station.predicted_errors is None:
+        return "Waiting", []
+    return get_evaluation_from_binary(station.predicted_errors, return_error_indices=True)
+
+
+def tile(frames, columns=2):
+    """Lays out the display frames in a grid, resized to the first one"""
+    height, width = frames[0].shape[:2]
+    frames = [cv2.resize(frame, (width, height)) for frame in frames]
+    frames += [np.zeros_like(frames[0])] * (-len(frames) % columns)
+    rows = [np.hstack(frames[i:i + columns]) for i in range(0, len(frames), columns)]
+    return np.vstack(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run several camera stations and/or several patients per camera with one shared classifier"
+    )
+    parser.add_argument("--sources", nargs="+", default=["0"], help="Camera indices or video files")
+    parser.add_argument("--poses", type=int, default=1, help="Patients tracked per source")
+    parser.add_argument("--exercises", nargs="*", default=None,
+                        help="Exercise per station, in source then left-to-right order (default: the registry default)")
+    parser.add_argument("--model", default=os.path.join(MODELS_DIR, "run_3.tflite"))
+    parser.add_argument("--frames", type=int, default=0, help="Stop after this many frames per source (0: run until closed)")
+    parser.add_argument("--fps", type=float, default=15)
+    parser.add_argument("--show", action="store_true", help="Display the sources in a grid")
+    args = parser.parse_args()
+
+    exercises = list(args.exercises or [])
+    for exercise in exercises:
+        if exercise not in REGISTRY:
+            parser.error(f"Unknown exercise '{exercise}'; choose from {', '.join(REGISTRY.names)}")
+
+    sources = []
+    stations = []
+    for s, source in enumerate(args.sources):
+        source_stations = []
+        for p in range(args.poses):
+            exercise = exercises[len(stations)] if len(stations) < len(exercises) else None
+            station = Station(f"{s}.{p + 1}", exercise)
+            source_stations.append(station)
+            stations.append(station)
+        sources.append(Source(source, source_stations))
+
+    settings = tuned_settings(args.model, max_threads=BUDGET["tflite"])
+    classifier = SharedClassifier(args.model, capacity=len(stations), **settings)
+    print(f"{len(stations)} stations on {len(sources)} sources, one classifier with batch size {len(stations)}")
+
+    frame_time = 1.0 / args.fps
+    frames = 0
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        while not args.frames or frames < args.frames:
+            frame_start = time.perf_counter()
+            if any(source.step() is None for source in sources):
+                break
+            frames += 1
+            for station in classifier.classify(stations):
+                print(f"[{station.name} {station.exercise}] {describe(station)[0]}")
+            if args.show:
+                cv2.imshow("Stations", cv2.cvtColor(tile([source.draw() for source in sources]), cv2.COLOR_RGB2BGR))
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+            time.sleep(max(0.0, frame_time - (time.perf_counter() - frame_start)))
+    finally:
+        for source in sources:
+            source.close()
+        cv2.destroyAllWindows()
+
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    stats = classifier.stats()
+    print(f"\n{frames} frames per source in {elapsed:.1f} s ({frames / max(elapsed, 1e-9):.1f} fps), "
+          f"CPU {cpu / max(elapsed, 1e-9):.0%} of one core, {cpu / max(elapsed, 1e-9) / len(stations):.0%} per station")
+    print(f"Classifier: {stats['windows']} windows in {stats['invokes']} invokes, "
+          f"{stats['ms_per_invoke']:.2f} ms per invoke, {stats['ms_per_window']:.2f} ms per window")
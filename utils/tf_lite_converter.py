@@ -1,13 +1,21 @@
 import os
-import tensorflow as tf
 import sys
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import tensorflow as tf
 
 # Ensure parent directory is in sys.path for import
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
+import architecture.custom_model
 from architecture.custom_model import PositionalEncoding, ErrorF1Score, error_focused_loss
+from pipeline.tuning import model_hash
 
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+MANIFEST_NAME = '.conversion_manifest.json'
 
 CUSTOM_OBJECTS = {
     'PositionalEncoding': PositionalEncoding,
@@ -15,33 +23,126 @@ CUSTOM_OBJECTS = {
     'loss': error_focused_loss,
 }
 
-def convert_keras_to_tflite(models_dir):
+# Everything that changes the converted output; a model is reconverted when any of it changes
+CONVERTER_OPTIONS = {
+    'supported_ops': ['TFLITE_BUILTINS', 'SELECT_TF_OPS'],
+    'lower_tensor_list_ops': False,
+    'tensorflow': tf.__version__,
+    # The custom layers are rebuilt from this code when a model is loaded for conversion
+    'custom_layers': model_hash(architecture.custom_model.__file__),
+}
+
+
+def convert_model(keras_path, tflite_path):
+    """Converts one .keras model, writing the .tflite file atomically"""
+    model = tf.keras.models.load_model(keras_path, custom_objects=CUSTOM_OBJECTS)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.target_spec.supported_ops = [
+        getattr(tf.lite.OpsSet, name) for name in CONVERTER_OPTIONS['supported_ops']
+    ]
+    converter._experimental_lower_tensor_list_ops = CONVERTER_OPTIONS['lower_tensor_list_ops']
+    tflite_model = converter.convert()
+    temporary_path = tflite_path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(tflite_model)
+    os.replace(temporary_path, tflite_path)
+    return model_hash(tflite_path)
+
+
+def load_manifest(models_dir):
+    path = os.path.join(models_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(models_dir, manifest):
+    path = os.path.join(models_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def is_up_to_date(entry, source_hash, tflite_path):
+    """True if the manifest entry matches the source, the options and the file on disk"""
+    return (
+        entry is not None
+        and entry.get('source_hash') == source_hash
+        and entry.get('options') == CONVERTER_OPTIONS
+        and os.path.exists(tflite_path)
+        and entry.get('tflite_hash') == model_hash(tflite_path)
+    )
+
+
+def convert_keras_to_tflite(models_dir, names=None, jobs=None, force=False):
     """
-    Converts all .keras models in the specified directory to .tflite format.
+    Converts the .keras models in the specified directory to .tflite format.
     The .tflite files are saved in the same directory as the originals.
+
+    Models whose source and converter options match the manifest are skipped;
+    the rest are converted in a process pool. Returns the failed filenames.
     """
-    for filename in os.listdir(models_dir):
-        if filename.endswith('.keras'):
-            keras_path = os.path.join(models_dir, filename)
-            tflite_path = os.path.splitext(keras_path)[0] + '.tflite'
+    manifest = load_manifest(models_dir)
+    pending = {}
+    for filename in sorted(os.listdir(models_dir)):
+        if not filename.endswith('.keras'):
+            continue
+        if names and os.path.splitext(filename)[0] not in names and filename not in names:
+            continue
+        keras_path = os.path.join(models_dir, filename)
+        tflite_path = os.path.splitext(keras_path)[0] + '.tflite'
+        source_hash = model_hash(keras_path)
+        if not force and is_up_to_date(manifest.get(filename), source_hash, tflite_path):
+            print(f"Up to date: {filename}")
+            continue
+        pending[filename] = (keras_path, tflite_path, source_hash)
+
+    if not pending:
+        return []
 
+    failures = {}
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+    # TensorFlow is not fork-safe once initialised, so workers are spawned
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {
+            filename: pool.submit(convert_model, keras_path, tflite_path)
+            for filename, (keras_path, tflite_path, _) in pending.items()
+        }
+        for filename, future in futures.items():
+            keras_path, tflite_path, source_hash = pending[filename]
             print(f"Converting {keras_path} -> {tflite_path}")
             try:
-                model = tf.keras.models.load_model(keras_path, custom_objects=CUSTOM_OBJECTS)
-                converter = tf.lite.TFLiteConverter.from_keras_model(model)
-                converter.target_spec.supported_ops = [
-                    tf.lite.OpsSet.TFLITE_BUILTINS,
-                    tf.lite.OpsSet.SELECT_TF_OPS
-                ]
-                converter._experimental_lower_tensor_list_ops = False
-                tflite_model = converter.convert()
-                with open(tflite_path, 'wb') as f:
-                    f.write(tflite_model)
-                print(f"Successfully converted: {filename} -> {os.path.basename(tflite_path)}")
+                tflite_hash = future.result()
             except Exception as e:
+                failures[filename] = e
+                manifest.pop(filename, None)
                 print(f"Failed to convert {filename}: {e}")
+                continue
+            manifest[filename] = {
+                'source_hash': source_hash,
+                'tflite_hash': tflite_hash,
+                'options': CONVERTER_OPTIONS,
+            }
+            # Saved after every model so finished work survives a later crash
+            save_manifest(models_dir, manifest)
+            print(f"Successfully converted: {filename} -> {os.path.basename(tflite_path)}")
+
+    print(f"\nConverted {len(pending) - len(failures)} of {len(pending)} changed models")
+    for filename, error in failures.items():
+        print(f"  FAILED {filename}: {type(error).__name__}: {str(error).splitlines()[0] if str(error) else ''}")
+    return sorted(failures)
 
 
 if __name__ == "__main__":
-    convert_keras_to_tflite(MODELS_DIR)
+    parser = argparse.ArgumentParser(description="Convert the changed .keras models to .tflite")
+    parser.add_argument("models", nargs="*", help="Model names to convert (default: all)")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel conversions (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Reconvert even if up to date")
+    args = parser.parse_args()
+
+    failed = convert_keras_to_tflite(args.models_dir, names=args.models, jobs=args.jobs, force=args.force)
+    if failed:
+        sys.exit(1)
     print("Conversion complete.")